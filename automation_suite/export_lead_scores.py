@@ -5,19 +5,68 @@ Uses only the Python standard library so no extra dependencies are required.
 import os
 import json
 import csv
-from urllib.request import urlopen
+import gzip
+import hashlib
+from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 
 API_URL = os.environ.get("API_URL", "http://127.0.0.1:8000")
+# The last download is kept with its ETag so an unchanged list is not re-sent.
+# Kept apart from the CLI's API_CACHE_DIR; set EXPORT_CACHE_DIR to an empty
+# string to disable it.
+EXPORT_CACHE_DIR = os.environ.get(
+    "EXPORT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "atl-business-export")
+)
+
+
+def _cache_path(url):
+    return os.path.join(EXPORT_CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def load_cached(url):
+    if not EXPORT_CACHE_DIR:
+        return None
+    try:
+        with open(_cache_path(url), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_cached(url, etag, body):
+    if not EXPORT_CACHE_DIR:
+        return
+    try:
+        os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+        with open(_cache_path(url), "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "body": body}, f)
+    except OSError:
+        pass
+
+
+def read_body(resp):
+    raw = resp.read()
+    if resp.headers.get("Content-Encoding") == "gzip":
+        raw = gzip.decompress(raw)
+    return raw.decode("utf-8")
 
 
 def fetch_businesses():
     url = API_URL.rstrip("/") + "/businesses"
+    headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
+    cached = load_cached(url)
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
     try:
-        with urlopen(url, timeout=10) as resp:
-            body = resp.read().decode("utf-8")
+        with urlopen(Request(url, headers=headers), timeout=10) as resp:
+            body = read_body(resp)
+            if resp.headers.get("ETag"):
+                store_cached(url, resp.headers["ETag"], body)
             return json.loads(body)
     except HTTPError as e:
+        if e.code == 304 and cached:
+            print("Businesses unchanged since last export; using cached copy")
+            return json.loads(cached["body"])
         print(f"HTTP error fetching businesses: {e.code} {e.reason}")
     except URLError as e:
         print(f"Network error: {e}")
@@ -0,0 +1,251 @@
+"""
+Admission control: per-client token buckets and a concurrency cap for expensive routes.
+
+`AdmissionController` holds the limits and counters; `AdmissionMiddleware` is
+a plain ASGI middleware that consults it before a request reaches the router.
+
+- Every (client, route) pair gets a token bucket; an empty bucket answers 429.
+  Routes are the app's path templates; unmatched paths share one key.
+- Expensive routes (full list scans, wide radius queries) may only run `max_concurrency` at a time.
+  Extra requests wait in a bounded queue and get 503 when the queue is full
+  or they have waited `queue_timeout` seconds.
+- Exempt paths (health checks) skip both and are never queued.
+
+Settings are read from the environment by `AdmissionController.from_env()`;
+a rate of 0 disables rate limiting and a concurrency of 0 disables the cap.
+Rate limiting is off unless `RATE_LIMIT_PER_SECOND` is set, since the bundled
+scripts (seed.py, cli.py) do not retry on 429.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.routing import Match
+
+UNMATCHED_ROUTE = "(unmatched)"
+
+
+def route_key(scope) -> str:
+    """Group requests by route template, e.g. `GET /businesses/17` -> `GET /businesses/{business_id}`.
+
+    Paths that match no route share one key, so junk URLs cannot grow the
+    bucket and stats tables.
+    """
+    for route in getattr(scope.get("app"), "routes", ()):
+        match, _ = route.matches(scope)
+        if match is not Match.NONE:
+            return f"{scope['method']} {route.path}"
+    return f"{scope['method']} {UNMATCHED_ROUTE}"
+
+
+def parse_route_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse `"GET /businesses=5:10;POST /businesses=1:5"` into {route: (rate, burst)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        route, _, value = item.rpartition("=")
+        rate, _, burst = value.partition(":")
+        limits[route.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        rate: float = 0.0,
+        burst: float = 200.0,
+        route_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        expensive_routes: Iterable[str] = ("GET /businesses", "GET /businesses/near"),
+        max_concurrency: int = 4,
+        max_queue: int = 16,
+        queue_timeout: float = 2.0,
+        exempt_paths: Iterable[str] = ("/health",),
+        max_buckets: int = 10000,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.route_limits = dict(route_limits or {})
+        self.expensive_routes = set(expensive_routes)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.exempt_paths = set(exempt_paths)
+        self.max_buckets = max_buckets
+
+        self._buckets: Dict[Tuple[str, str], list] = {}
+        self._active = 0
+        self._waiters = deque()
+        self._stats = {
+            "admitted": 0,
+            "rate_limited": 0,
+            "shed_queue_full": 0,
+            "shed_timeout": 0,
+            "queued": 0,
+            "peak_active": 0,
+            "peak_queued": 0,
+        }
+        self._per_route: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        env = os.environ
+        return cls(
+            rate=float(env.get("RATE_LIMIT_PER_SECOND", "0")),
+            burst=float(env.get("RATE_LIMIT_BURST", "200")),
+            route_limits=parse_route_limits(env.get("RATE_LIMIT_ROUTES", "")),
+            expensive_routes=[r.strip() for r in env.get("EXPENSIVE_ROUTES", "GET /businesses;GET /businesses/near").split(";") if r.strip()],
+            max_concurrency=int(env.get("EXPENSIVE_MAX_CONCURRENCY", "4")),
+            max_queue=int(env.get("EXPENSIVE_MAX_QUEUE", "16")),
+            queue_timeout=float(env.get("EXPENSIVE_QUEUE_TIMEOUT", "2.0")),
+        )
+
+    def record(self, route: str, outcome: str) -> None:
+        self._stats[outcome] += 1
+        counts = self._per_route.setdefault(route, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    def take_token(self, client: str, route: str) -> Optional[float]:
+        """Spend one token. Returns None if allowed, else seconds until a token is available."""
+        rate, burst = self.route_limits.get(route, (self.rate, self.burst))
+        if rate <= 0:
+            return None
+        now = time.monotonic()
+        key = (client, route)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._prune(now)
+            bucket = self._buckets[key] = [burst, now]
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return (1.0 - tokens) / rate
+        bucket[0] = tokens - 1.0
+        return None
+
+    def _prune(self, now: float) -> None:
+        # drop buckets that have refilled completely; they carry no state
+        for key, (tokens, last) in list(self._buckets.items()):
+            rate, burst = self.route_limits.get(key[1], (self.rate, self.burst))
+            if tokens + (now - last) * rate >= burst:
+                del self._buckets[key]
+        if len(self._buckets) >= self.max_buckets:
+            # still full of active clients: evict the least recently used half
+            stale = sorted(self._buckets, key=lambda key: self._buckets[key][1])
+            for key in stale[:len(stale) // 2 + 1]:
+                del self._buckets[key]
+
+    async def acquire_slot(self) -> Optional[str]:
+        """Wait for an expensive-query slot. Returns None when admitted, else the shed reason."""
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._stats["peak_active"] = max(self._stats["peak_active"], self._active)
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "shed_queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        self._stats["peak_queued"] = max(self._stats["peak_queued"], len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            return "shed_timeout"
+        except asyncio.CancelledError:
+            # client went away while queued
+            self._abandon(waiter)
+            raise
+        return None
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # a slot was handed over just as we gave up; pass it on
+            self.release_slot()
+        else:
+            waiter.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # hand the slot straight to the next waiter; _active is unchanged
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "clients_tracked": len(self._buckets),
+            "limits": {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "route_limits": {route: {"rate_per_second": r, "burst": b} for route, (r, b) in self.route_limits.items()},
+                "expensive_routes": sorted(self.expensive_routes),
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+            },
+            "routes": self._per_route,
+        }
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controller
+        if scope["type"] != "http" or scope["path"] in controller.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        route = route_key(scope)
+        client = scope["client"][0] if scope.get("client") else "unknown"
+
+        wait = controller.take_token(client, route)
+        if wait is not None:
+            controller.record(route, "rate_limited")
+            await _reject(send, 429, "Too many requests", wait)
+            return
+
+        if controller.max_concurrency <= 0 or route not in controller.expensive_routes:
+            controller.record(route, "admitted")
+            await self.app(scope, receive, send)
+            return
+
+        shed = await controller.acquire_slot()
+        if shed is not None:
+            controller.record(route, shed)
+            await _reject(send, 503, "Server busy, try again later", controller.queue_timeout)
+            return
+        controller.record(route, "admitted")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release_slot()
@@ -0,0 +1,213 @@
+"""
+Negotiated response compression (zstd, brotli, gzip).
+
+`CompressionMiddleware` picks the best encoding from `Accept-Encoding`,
+compresses bodies chunk by chunk as the app sends them, and leaves small
+or already-encoded responses alone. gzip always works; zstd and brotli are
+offered when `compression.zstd` (Python 3.14+) / `zstandard` and `brotli`
+are importable.
+
+Each encoding is a different representation, so the ETag set by
+`ETagMiddleware` gets the encoding appended (`"abc"` -> `"abc-gzip"`), and
+the suffix is stripped again from incoming `If-None-Match` headers.
+"""
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .etag import get_header, parse_etags
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+except ImportError:
+    _zstd = None
+try:
+    import zstandard as _zstandard
+except ImportError:
+    _zstandard = None
+try:
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+class _GzipEncoder:
+    def __init__(self, level: int = 6) -> None:
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class _ZstdEncoder:
+    def __init__(self) -> None:
+        if _zstd is not None:
+            self._obj = _zstd.ZstdCompressor()
+            self._flush = lambda: self._obj.flush(_zstd.ZstdCompressor.FLUSH_FRAME)
+        else:
+            self._obj = _zstandard.ZstdCompressor().compressobj()
+            self._flush = self._obj.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._flush()
+
+
+class _BrotliEncoder:
+    def __init__(self) -> None:
+        self._obj = _brotli.Compressor(quality=5)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.finish()
+
+
+def available_encodings() -> Dict[str, type]:
+    """Supported encodings in server preference order."""
+    encoders = {}
+    if _zstd is not None or _zstandard is not None:
+        encoders["zstd"] = _ZstdEncoder
+    if _brotli is not None:
+        encoders["br"] = _BrotliEncoder
+    encoders["gzip"] = _GzipEncoder
+    return encoders
+
+
+def negotiate(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """Pick an encoding for an Accept-Encoding value; None means send identity."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for name in supported:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _strip_suffixes(header: bytes, encodings: List[str]) -> Tuple[bytes, Optional[str]]:
+    """Remove `-<encoding>` from each tag. Returns the new header and the suffix seen."""
+    seen = None
+    tags = []
+    for tag in parse_etags(header.decode("latin-1")):
+        for name in encodings:
+            suffix = f'-{name}"'
+            if tag.endswith(suffix):
+                tag = tag[:-len(suffix)] + '"'
+                seen = name
+                break
+        tags.append(tag)
+    return ", ".join(tags).encode("latin-1"), seen
+
+
+def _with_suffix(etag: bytes, encoding: str) -> bytes:
+    if etag.endswith(b'"'):
+        return etag[:-1] + f"-{encoding}\"".encode("latin-1")
+    return etag
+
+
+def _with_vary(headers: list) -> list:
+    vary = get_header(headers, b"vary")
+    headers = [(k, v) for k, v in headers if k.lower() != b"vary"]
+    headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, encodings: Optional[List[str]] = None) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = available_encodings()
+        if encodings is not None:
+            self.encoders = {name: cls for name, cls in self.encoders.items() if name in encodings}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        accept = get_header(headers, b"accept-encoding")
+        encoding = negotiate(accept.decode("latin-1"), list(self.encoders)) if accept else None
+
+        if_none_match = get_header(headers, b"if-none-match")
+        client_suffix = None
+        if if_none_match:
+            stripped, client_suffix = _strip_suffixes(if_none_match, list(self.encoders))
+            headers = [(k, v) for k, v in headers if k.lower() != b"if-none-match"] + [(b"if-none-match", stripped)]
+            scope = {**scope, "headers": headers}
+
+        start = None
+        encoder = None
+
+        async def send_compressed(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                response_headers = list(message.get("headers", []))
+                if message["status"] == 304 and client_suffix:
+                    # confirm the representation the client holds, including its encoding;
+                    # a 304 carries the Vary the 200 would have (RFC 9110 15.4.5)
+                    message = {**message, "headers": _with_vary([
+                        (k, _with_suffix(v, client_suffix) if k.lower() == b"etag" else v)
+                        for k, v in response_headers
+                    ])}
+                    await send(message)
+                    return
+                content_type = (get_header(response_headers, b"content-type") or b"").decode("latin-1")
+                if (encoding is None or get_header(response_headers, b"content-encoding") is not None
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                    await send(message)
+                    return
+                start = message
+                return
+
+            if start is None and encoder is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                response_start, start = start, None
+                response_headers = list(response_start.get("headers", []))
+                if not more_body and len(body) < self.minimum_size:
+                    await send(response_start)
+                    await send(message)
+                    return
+                encoder = self.encoders[encoding]()
+                response_headers = [
+                    (k, _with_suffix(v, encoding) if k.lower() == b"etag" else v)
+                    for k, v in response_headers if k.lower() != b"content-length"
+                ]
+                response_headers = _with_vary(response_headers)
+                response_headers.append((b"content-encoding", encoding.encode("latin-1")))
+                await send({**response_start, "headers": response_headers})
+
+            chunk = encoder.compress(body)
+            if not more_body:
+                chunk += encoder.flush()
+                encoder = None
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
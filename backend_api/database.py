@@ -1,40 +1,287 @@
-from typing import List, Optional
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+from .geo import GridIndex, coords_from_maps_url
 from .schemas import Business, BusinessCreate, BusinessUpdate
+from .snapshot import Snapshot, write_snapshot
+
+
+def business_matches(business: Business, neighborhood: Optional[str] = None, category: Optional[str] = None,
+                     min_lead_score: Optional[float] = None) -> bool:
+    """The list filters of GET /businesses (case-insensitive equality, minimum score)."""
+    if neighborhood and (business.neighborhood or "").lower() != neighborhood.lower():
+        return False
+    if category and (business.category or "").lower() != category.lower():
+        return False
+    if min_lead_score is not None and business.lead_score < min_lead_score:
+        return False
+    return True
+
+
+def _fill_coordinates(fields: dict) -> None:
+    """Take latitude/longitude from the Maps URL when they were not given explicitly."""
+    if fields.get("latitude") is not None or fields.get("longitude") is not None:
+        return
+    coords = coords_from_maps_url(fields.get("google_maps_url"))
+    if coords:
+        fields["latitude"], fields["longitude"] = coords
 
 
 class InMemoryDB:
     def __init__(self) -> None:
         self._businesses: List[Business] = []
         self._next_id: int = 1
+        # Read-only base layer loaded from a snapshot file. Rows that are
+        # updated or deleted after loading are recorded in `_overrides`
+        # (None marks a deletion); new rows go to `_businesses` as usual.
+        self._snapshot: Optional[Snapshot] = None
+        self._overrides: Dict[int, Optional[Business]] = {}
+        # (snapshot, its rows as models), built by the first unfiltered listing
+        self._snapshot_rows: Optional[Tuple[Snapshot, List[Business]]] = None
+        self._geo = GridIndex()
+        # snapshot coordinates are indexed by warm_up() or on first use, so loading stays cheap
+        self._geo_loaded = True
+        self._geo_lock = threading.Lock()
+        # Writes are serialized and counted so background jobs (see jobs.py)
+        # can build replacements off to the side and only swap them in if
+        # nothing changed meanwhile.
+        self._lock = threading.RLock()
+        self._writes = 0
+
+    @property
+    def write_count(self) -> int:
+        return self._writes
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
+    @property
+    def overlay_size(self) -> int:
+        """Rows held outside the snapshot: changed or deleted snapshot rows plus new ones."""
+        return len(self._overrides) + len(self._businesses)
+
+    @property
+    def has_snapshot(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def geo_index_loaded(self) -> bool:
+        return self._geo_loaded
+
+    def empty_geo_index(self) -> GridIndex:
+        """A new index with the same cell size, for rebuilding off to the side."""
+        return GridIndex(self._geo.cell_degrees)
+
+    def _is_snapshot_row(self, business_id: int) -> bool:
+        return self._snapshot is not None and self._snapshot.index_of(business_id) is not None
+
+    def load_snapshot(self, path: str) -> None:
+        snapshot = Snapshot(path)
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+            self._snapshot = snapshot
+            self._snapshot_rows = None
+            self._overrides.clear()
+            self._businesses.clear()
+            self._next_id = snapshot.next_id
+            self._geo.clear()
+            self._geo_loaded = False
+            self._writes += 1
+
+    def save_snapshot(self, path: str) -> int:
+        tmp_path = path + ".tmp"
+        count = write_snapshot(tmp_path, self.list_businesses(), next_id=self._next_id)
+        os.replace(tmp_path, path)
+        return count
 
-    def list_businesses(self) -> List[Business]:
-        return self._businesses
+    def swap_snapshot(self, path: str, expected_writes: int) -> bool:
+        """Make `path` (written from this DB's current rows) the new base layer.
+
+        Returns False without changing anything if a write happened after
+        `expected_writes` was read. The old mapping is left for the garbage
+        collector because in-flight requests may still be reading from it.
+        """
+        snapshot = Snapshot(path)
+        with self._lock:
+            if self._writes != expected_writes:
+                snapshot.close()
+                return False
+            self._snapshot = snapshot
+            self._snapshot_rows = None
+            self._overrides = {}
+            self._businesses = []
+            return True
+
+    def _load_geo(self) -> None:
+        if self._geo_loaded:
+            return
+        with self._geo_lock:
+            if self._geo_loaded:
+                return
+            overrides = self._overrides
+            self._geo.bulk_load(
+                (business_id, lat, lon) for business_id, lat, lon in self._snapshot.coordinates()
+                if business_id not in overrides
+            )
+            self._geo_loaded = True
+
+    def warm_up(self) -> None:
+        """Build deferred indexes. Called from a background thread once the server is up."""
+        self._load_geo()
+
+    def iter_coordinates(self) -> Iterator[Tuple[int, float, float]]:
+        """(id, lat, lon) for every live row with coordinates, without materializing rows."""
+        snapshot, overrides, businesses = self._snapshot, self._overrides, list(self._businesses)
+        if snapshot is not None:
+            for business_id, lat, lon in snapshot.coordinates():
+                if business_id not in overrides:
+                    yield business_id, lat, lon
+        for business in list(overrides.values()) + businesses:
+            if business is not None and business.latitude is not None and business.longitude is not None:
+                yield business.id, business.latitude, business.longitude
+
+    def replace_geo_index(self, index: GridIndex, expected_writes: int) -> bool:
+        with self._lock:
+            if self._writes != expected_writes:
+                return False
+            self._geo = index
+            return True
+
+    def list_businesses(self, neighborhood: Optional[str] = None, category: Optional[str] = None,
+                        min_lead_score: Optional[float] = None) -> List[Business]:
+        # read the layers together so a concurrent swap_snapshot() cannot drop rows
+        snapshot, overrides, overlay = self._snapshot, self._overrides, self._businesses
+        filtered = bool(neighborhood or category or min_lead_score is not None)
+        if filtered:
+            overlay = [b for b in overlay if business_matches(b, neighborhood, category, min_lead_score)]
+        if snapshot is None:
+            return overlay
+
+        if filtered:
+            # Filter on the mapped columns and build models only for matching
+            # rows; changed rows are checked against their current values.
+            businesses = [
+                snapshot.business_at(row)
+                for row in snapshot.matching_rows(neighborhood, category, min_lead_score)
+                if snapshot.id_at(row) not in overrides
+            ]
+            businesses.extend(b for b in list(overrides.values())
+                              if b is not None and business_matches(b, neighborhood, category, min_lead_score))
+            businesses.sort(key=lambda b: b.id)
+        else:
+            cached = self._snapshot_rows
+            if cached is None or cached[0] is not snapshot:
+                cached = self._snapshot_rows = (snapshot, list(snapshot))
+            get = overrides.get
+            businesses = [b for b in (get(row.id, row) for row in cached[1]) if b is not None]
+        businesses.extend(overlay)
+        return businesses
+
+    def iter_businesses(self) -> Iterator[Business]:
+        """Like list_businesses(), but materializes snapshot rows one at a time."""
+        snapshot, overrides, businesses = self._snapshot, self._overrides, list(self._businesses)
+        if snapshot is not None:
+            for row in range(len(snapshot)):
+                business_id = snapshot.id_at(row)
+                if business_id in overrides:
+                    if overrides[business_id] is not None:
+                        yield overrides[business_id]
+                else:
+                    yield snapshot.business_at(row)
+        yield from businesses
 
     def get_business(self, business_id: int) -> Optional[Business]:
-        return next((b for b in self._businesses if b.id == business_id), None)
+        snapshot, overrides, overlay = self._snapshot, self._overrides, self._businesses
+        if snapshot is not None:
+            if business_id in overrides:
+                return overrides[business_id]
+            business = snapshot.get(business_id)
+            if business is not None:
+                return business
+        return next((b for b in overlay if b.id == business_id), None)
 
     def create_business(self, data: BusinessCreate) -> Business:
-        business = Business(id=self._next_id, **data.dict(), lead_score=0.0)
-        self._businesses.append(business)
-        self._next_id += 1
+        fields = data.dict()
+        _fill_coordinates(fields)
+        self._load_geo()
+        with self._lock:
+            business = Business(id=self._next_id, **fields, lead_score=0.0)
+            self._businesses.append(business)
+            self._geo.update(business.id, business.latitude, business.longitude)
+            self._next_id += 1
+            self._writes += 1
         return business
 
     def update_business(self, business_id: int, data: BusinessUpdate) -> Optional[Business]:
-        business = self.get_business(business_id)
-        if not business:
-            return None
+        self._load_geo()
+        with self._lock:
+            business = self.get_business(business_id)
+            if not business:
+                return None
+            if self._is_snapshot_row(business_id):
+                # keep the materialized row so later mutations (e.g. rescoring) stick
+                self._overrides[business_id] = business
+
+            update_data = data.dict(exclude_unset=True)
+            if "google_maps_url" in update_data and "latitude" not in update_data and "longitude" not in update_data:
+                # coordinates follow the URL unless given explicitly; a URL without any clears the old ones
+                coords = coords_from_maps_url(update_data["google_maps_url"])
+                update_data["latitude"], update_data["longitude"] = coords or (None, None)
+            for key, value in update_data.items():
+                setattr(business, key, value)
+            self._geo.update(business.id, business.latitude, business.longitude)
+            self._writes += 1
+        return business
 
-        update_data = data.dict(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(business, key, value)
+    def set_lead_score(self, business_id: int, score: float) -> Optional[Business]:
+        self._load_geo()
+        with self._lock:
+            business = self.get_business(business_id)
+            if not business:
+                return None
+            if self._is_snapshot_row(business_id):
+                self._overrides[business_id] = business
+            business.lead_score = score
+            self._writes += 1
         return business
 
+    def businesses_near(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Business, float]]:
+        """Businesses within `radius_km` of (lat, lon) with their distance, nearest first."""
+        self._load_geo()
+        nearby = []
+        for business_id, distance in self._geo.within(lat, lon, radius_km):
+            business = self.get_business(business_id)
+            if business is not None:
+                nearby.append((business, distance))
+        return nearby
+
     def delete_business(self, business_id: int) -> bool:
-        business = self.get_business(business_id)
-        if not business:
-            return False
-        self._businesses.remove(business)
-        return True
+        self._load_geo()
+        with self._lock:
+            business = self.get_business(business_id)
+            if not business:
+                return False
+            self._geo.remove(business_id)
+            self._writes += 1
+            if self._is_snapshot_row(business_id):
+                self._overrides[business_id] = None
+                return True
+            self._businesses.remove(business)
+            return True
+
+
+# Multi-worker mode: every worker replicates one shared store (see shared_store.py).
+STORE_ADDRESS = os.environ.get("STORE_ADDRESS")
+# Warm start: serve reads straight from a memory-mapped snapshot when one is configured.
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH")
 
+if STORE_ADDRESS:
+    from .shared_store import SharedStoreClient
 
-db = InMemoryDB()
+    db = SharedStoreClient(STORE_ADDRESS)
+else:
+    db = InMemoryDB()
+    if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+        db.load_snapshot(SNAPSHOT_PATH)
@@ -0,0 +1,93 @@
+"""
+Strong ETags and `If-None-Match` handling for GET responses.
+
+`ETagMiddleware` hashes the body of every successful, fully rendered GET
+response (FastAPI renders JSON in a single body message) and answers 304
+Not Modified when the client already holds that version. Streaming
+responses are passed through untouched.
+"""
+import hashlib
+from typing import Iterable, List, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+# headers a 304 must repeat from the 200 it stands in for (RFC 9110, 15.4.5)
+_NOT_MODIFIED_HEADERS = {b"cache-control", b"content-location", b"date", b"etag", b"expires", b"vary"}
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def parse_etags(header: str) -> List[str]:
+    """Split an If-None-Match value into opaque tags, dropping weak prefixes."""
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+def etag_matches(etag: str, if_none_match: Iterable[str]) -> bool:
+    # If-None-Match uses the weak comparison function
+    return any(tag == "*" or tag == etag for tag in if_none_match)
+
+
+def get_header(headers: Headers, name: bytes):
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ETagMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = get_header(scope["headers"], b"if-none-match")
+        requested = parse_etags(if_none_match.decode("latin-1")) if if_none_match else []
+        start = None
+
+        async def send_with_etag(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if message["status"] != 200 or get_header(headers, b"etag") is not None:
+                    await send(message)
+                    return
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            response_start, start = start, None
+            if message.get("more_body", False):
+                # streaming response: the body is not known up front, so no ETag
+                await send(response_start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            etag = compute_etag(body)
+            headers = list(response_start.get("headers", [])) + [(b"etag", etag.encode("latin-1"))]
+            if etag_matches(etag, requested):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(k, v) for k, v in headers if k.lower() in _NOT_MODIFIED_HEADERS],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({**response_start, "headers": headers})
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,154 @@
+"""
+Coordinates for businesses: Maps URL parsing, great-circle distance and a grid index.
+
+`GridIndex` buckets points into fixed lat/lon cells so a radius query only
+looks at the cells overlapping the search circle instead of every business.
+"""
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+_NUMBER = r"(-?\d{1,3}(?:\.\d+)?)"
+_AT_PATTERN = re.compile(r"@" + _NUMBER + r"," + _NUMBER)
+_DATA_PATTERN = re.compile(r"!3d" + _NUMBER + r"!4d" + _NUMBER)
+_PAIR_PATTERN = re.compile(r"^\s*" + _NUMBER + r"\s*,\s*" + _NUMBER + r"\s*$")
+_QUERY_KEYS = ("ll", "q", "query", "center", "destination", "sll")
+
+
+def _valid(lat: float, lon: float) -> Optional[Tuple[float, float]]:
+    if -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0:
+        return lat, lon
+    return None
+
+
+def coords_from_maps_url(url) -> Optional[Tuple[float, float]]:
+    """Extract (lat, lon) from a Google Maps style URL, or None if it has none.
+
+    Understands `.../@33.749,-84.388,15z`, `...!3d33.749!4d-84.388` and
+    query parameters such as `?q=33.749,-84.388` or `?ll=...`.
+    """
+    if not url:
+        return None
+    parts = urlsplit(str(url))
+    path = unquote(parts.path)
+
+    # the place marker (!3d/!4d) is more precise than the viewport centre (@)
+    for pattern in (_DATA_PATTERN, _AT_PATTERN):
+        match = pattern.search(path)
+        if match:
+            return _valid(float(match.group(1)), float(match.group(2)))
+
+    query = parse_qs(parts.query)
+    for key in _QUERY_KEYS:
+        for value in query.get(key, []):
+            match = _PAIR_PATTERN.match(value)
+            if match:
+                return _valid(float(match.group(1)), float(match.group(2)))
+    return None
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """Uniform lat/lon grid of business ids. The default 0.05 degree cell is ~5.5 km tall."""
+
+    def __init__(self, cell_degrees: float = 0.05) -> None:
+        self.cell_degrees = cell_degrees
+        self._columns = math.ceil(360.0 / cell_degrees)
+        self._cells: Dict[Tuple[int, int], Dict[int, Tuple[float, float]]] = {}
+        self._positions: Dict[int, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (
+            math.floor((lat + 90.0) / self.cell_degrees),
+            math.floor((lon + 180.0) / self.cell_degrees) % self._columns,
+        )
+
+    def insert(self, business_id: int, lat: float, lon: float) -> None:
+        self.remove(business_id)
+        self._positions[business_id] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), {})[business_id] = (lat, lon)
+
+    def remove(self, business_id: int) -> None:
+        position = self._positions.pop(business_id, None)
+        if position is None:
+            return
+        cell = self._cell(*position)
+        members = self._cells[cell]
+        del members[business_id]
+        if not members:
+            del self._cells[cell]
+
+    def update(self, business_id: int, lat: Optional[float], lon: Optional[float]) -> None:
+        if lat is None or lon is None:
+            self.remove(business_id)
+        else:
+            self.insert(business_id, lat, lon)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._positions.clear()
+
+    def bulk_load(self, points: Iterable[Tuple[int, float, float]]) -> None:
+        # inlined insert(): this runs over every row when a snapshot is loaded
+        cells, positions = self._cells, self._positions
+        size, columns, floor = self.cell_degrees, self._columns, math.floor
+        for business_id, lat, lon in points:
+            if business_id in positions:
+                self.remove(business_id)
+            position = positions[business_id] = (lat, lon)
+            cell = (floor((lat + 90.0) / size), floor((lon + 180.0) / size) % columns)
+            members = cells.get(cell)
+            if members is None:
+                members = cells[cell] = {}
+            members[business_id] = position
+
+    def _candidate_cells(self, lat: float, lon: float, radius_km: float):
+        dlat = radius_km / KM_PER_DEGREE
+        rows = range(
+            max(0, math.floor((lat - dlat + 90.0) / self.cell_degrees)),
+            math.floor((min(90.0, lat + dlat) + 90.0) / self.cell_degrees) + 1,
+        )
+        # longitude degrees shrink towards the poles; widen the search accordingly
+        cos_lat = math.cos(math.radians(min(90.0, abs(lat) + dlat)))
+        if cos_lat < 1e-9 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180.0:
+            columns = range(self._columns)
+        else:
+            dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+            first = math.floor((lon - dlon + 180.0) / self.cell_degrees)
+            last = math.floor((lon + dlon + 180.0) / self.cell_degrees)
+            columns = sorted({c % self._columns for c in range(first, last + 1)})
+
+        # Queries run without the writers' lock, so only iterate copies: list()
+        # of a dict is taken atomically under the GIL, a live view is not.
+        if len(rows) * len(columns) > len(self._cells):
+            # cheaper to walk the occupied cells than to probe every candidate
+            wanted = set(columns)
+            return [members for (row, col), members in list(self._cells.items()) if row in rows and col in wanted]
+        get = self._cells.get
+        return [members for members in (get((row, col)) for row in rows for col in columns) if members is not None]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+        """Return (business_id, distance_km) pairs within `radius_km`, nearest first."""
+        hits = []
+        for members in self._candidate_cells(lat, lon, radius_km):
+            for business_id, (plat, plon) in list(members.items()):
+                distance = haversine_km(lat, lon, plat, plon)
+                if distance <= radius_km:
+                    hits.append((business_id, distance))
+        hits.sort(key=lambda hit: (hit[1], hit[0]))
+        return hits
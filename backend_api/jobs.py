@@ -0,0 +1,144 @@
+"""
+Background jobs run by the API's scheduler (see scheduler.py).
+
+- rescore: recompute `lead_score` for every business and write back the
+  ones that changed (e.g. after the scoring rules change or a snapshot with
+  stale scores is loaded).
+- compact: rebuild the geo index so dicts shrunk by deletes release memory,
+  and, when `SNAPSHOT_PATH` is set, fold the rows changed since the snapshot
+  was loaded into a new snapshot file so lookups go back to the fast path
+  (not on Windows, which cannot replace a mapped file).
+- export: stream every business to a CSV file (same columns as
+  automation_suite/export_lead_scores.py), replacing the file atomically.
+
+Each job yields every `batch` rows so the scheduler can pause it; the
+snapshot encode yields between batches of each column too. Work built
+off to the side is only swapped in if no write happened meanwhile; otherwise
+it is dropped and redone on the next run.
+
+Settings (environment):
+    SCHEDULER_ENABLED      0 disables all jobs (default 1)
+    JOB_CPU_BUDGET         share of one core per job, default 0.1
+    <NAME>_CPU_BUDGET      per-job override, e.g. EXPORT_CPU_BUDGET=0.25
+    JOB_SLICE_MS           longest uninterrupted slice, default 5
+    RESCORE_INTERVAL       seconds, default 300
+    COMPACT_INTERVAL       seconds, default 600
+    COMPACT_MIN_CHANGES    changed rows needed before folding a snapshot, default 1000
+    EXPORT_INTERVAL        seconds, default 3600
+    EXPORT_PATH            CSV destination; the export job is off when unset
+"""
+import csv
+import os
+import tempfile
+
+from .lead_scoring import calculate_lead_score
+from .scheduler import Job, Scheduler
+from .snapshot import write_snapshot_steps
+
+EXPORT_FIELDS = ["id", "name", "neighborhood", "category", "lead_score", "reviews_count", "avg_rating"]
+
+
+def rescore_job(db, writer=None, batch: int = 200):
+    """Recompute lead scores. Writes go through `writer` (default `db`)."""
+    writer = writer or db
+    scanned = changed = 0
+    for business in db.iter_businesses():
+        score = calculate_lead_score(business)
+        if score != business.lead_score:
+            writer.set_lead_score(business.id, score)
+            changed += 1
+        scanned += 1
+        if scanned % batch == 0:
+            yield
+    return {"scanned": scanned, "changed": changed}
+
+
+def _temp_path(path: str) -> str:
+    # unique per call: several workers (or a slow previous run) may target the same file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    return tmp_path
+
+
+def compact_job(db, snapshot_path=None, min_changes: int = 1000, batch: int = 2000):
+    result = {"geo_rebuilt": False, "snapshot_folded": False}
+
+    if db.geo_index_loaded:
+        expected = db.write_count
+        index = db.empty_geo_index()
+        points = []
+        for point in db.iter_coordinates():
+            points.append(point)
+            if len(points) == batch:
+                index.bulk_load(points)
+                points = []
+                yield
+        index.bulk_load(points)
+        result["geo_rebuilt"] = db.replace_geo_index(index, expected)
+        yield
+
+    # Windows cannot replace a file that is memory-mapped, and the current
+    # snapshot stays mapped by in-flight readers and other workers, so the
+    # fold only runs where replacing a mapped file is allowed.
+    changes = db.overlay_size
+    if (snapshot_path and os.name != "nt"
+            and (changes >= min_changes or (not db.has_snapshot and changes))):
+        expected = db.write_count
+        rows = []
+        for business in db.iter_businesses():
+            rows.append(business)
+            if len(rows) % batch == 0:
+                yield
+        tmp_path = _temp_path(snapshot_path)
+        try:
+            yield from write_snapshot_steps(tmp_path, rows, next_id=db.next_id, batch=batch)
+            if db.swap_snapshot(tmp_path, expected):
+                os.replace(tmp_path, snapshot_path)
+                result["snapshot_folded"] = True
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        result["rows"] = len(rows)
+    return result
+
+
+def export_job(db, path: str, batch: int = 500):
+    tmp_path = _temp_path(path)
+    rows = 0
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_FIELDS)
+            for business in db.iter_businesses():
+                writer.writerow([getattr(business, field) for field in EXPORT_FIELDS])
+                rows += 1
+                if rows % batch == 0:
+                    yield
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return {"rows": rows, "path": path}
+
+
+def build_scheduler(db, writer=None) -> Scheduler:
+    """Scheduler with the standard jobs, configured from the environment."""
+    env = os.environ
+    scheduler = Scheduler()
+    if env.get("SCHEDULER_ENABLED", "1") == "0":
+        return scheduler
+
+    default_budget = float(env.get("JOB_CPU_BUDGET", "0.1"))
+    slice_seconds = float(env.get("JOB_SLICE_MS", "5")) / 1000
+
+    def add(name, func, interval):
+        budget = float(env.get(f"{name.upper()}_CPU_BUDGET", default_budget))
+        scheduler.add(Job(name, func, interval, cpu_budget=budget, slice_seconds=slice_seconds))
+
+    add("rescore", lambda: rescore_job(db, writer), float(env.get("RESCORE_INTERVAL", "300")))
+    add("compact", lambda: compact_job(db, env.get("SNAPSHOT_PATH"), int(env.get("COMPACT_MIN_CHANGES", "1000"))),
+        float(env.get("COMPACT_INTERVAL", "600")))
+    if env.get("EXPORT_PATH"):
+        add("export", lambda: export_job(db, env["EXPORT_PATH"]), float(env.get("EXPORT_INTERVAL", "3600")))
+    return scheduler
@@ -1,14 +1,45 @@
+import os
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query
 from typing import List, Optional
 
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import db
-from .schemas import Business, BusinessCreate, BusinessUpdate
+from .admission import AdmissionController, AdmissionMiddleware
+from .compression import CompressionMiddleware
+from .database import STORE_ADDRESS, business_matches, db
+from .etag import ETagMiddleware
+from .jobs import build_scheduler
+from .schemas import Business, BusinessCreate, BusinessNearby, BusinessUpdate
 from .lead_scoring import calculate_lead_score
 
-app = FastAPI()
 
+@asynccontextmanager
+async def lifespan(app):
+    # Index builds and the replica sync run after startup so the listener
+    # comes up immediately; requests arriving meanwhile do the same work on
+    # demand. The OpenAPI schema is left to FastAPI, which builds it on the
+    # first /openapi.json request.
+    threading.Thread(target=db.warm_up, name="warm-up", daemon=True).start()
+    if scheduler is not None:
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        scheduler.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+admission = AdmissionController.from_env()
+# with a shared store the jobs run in the store process (see shared_store.main)
+scheduler = None if STORE_ADDRESS else build_scheduler(db)
+
+# Middleware added first runs innermost: ETags are computed on the plain body,
+# then compressed; admission rejects before any of that, inside CORS so
+# rejected requests still carry CORS headers.
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.environ.get("COMPRESSION_MIN_SIZE", "1024")))
+app.add_middleware(AdmissionMiddleware, controller=admission)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -16,32 +47,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# async so health checks run on the event loop and never wait for a worker thread
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
+@app.get("/admin/admission")
+def admission_stats():
+    return admission.stats()
+
+@app.get("/admin/jobs")
+def job_status():
+    return db.job_status() if scheduler is None else scheduler.status()
+
 @app.get("/businesses", response_model=List[Business])
 def list_businesses(
     neighborhood: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     min_lead_score: Optional[float] = Query(None),
 ):
-    businesses = db.list_businesses()
-
-    if neighborhood:
-        businesses = [b for b in businesses if (b.neighborhood or "").lower() == neighborhood.lower()]
-    if category:
-        businesses = [b for b in businesses if (b.category or "").lower() == category.lower()]
-    if min_lead_score is not None:
-        businesses = [b for b in businesses if b.lead_score >= min_lead_score]
+    return db.list_businesses(neighborhood, category, min_lead_score)
 
-    return businesses
+# must be registered before /businesses/{business_id}
+@app.get("/businesses/near", response_model=List[BusinessNearby])
+def businesses_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(..., gt=0, le=20000),
+    neighborhood: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    min_lead_score: Optional[float] = Query(None),
+):
+    return [
+        BusinessNearby(**b.dict(), distance_km=round(distance, 3))
+        for b, distance in db.businesses_near(lat, lon, radius_km)
+        if business_matches(b, neighborhood, category, min_lead_score)
+    ]
 
 @app.post("/businesses", response_model=Business)
 def create_business(payload: BusinessCreate):
     business = db.create_business(payload)
-    business.lead_score = calculate_lead_score(business)
-    return business
+    return db.set_lead_score(business.id, calculate_lead_score(business))
 
 @app.get("/businesses/{business_id}", response_model=Business)
 def get_business(business_id: int):
@@ -55,8 +101,7 @@ def update_business(business_id: int, payload: BusinessUpdate):
     business = db.update_business(business_id, payload)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
-    business.lead_score = calculate_lead_score(business)
-    return business
+    return db.set_lead_score(business.id, calculate_lead_score(business))
 
 @app.delete("/businesses/{business_id}")
 def delete_business(business_id: int):
@@ -0,0 +1,136 @@
+"""
+In-process scheduler for cooperative, time-sliced background jobs.
+
+A job is a function returning a generator. Each `yield` marks a point where
+the job can pause safely, and whatever the generator returns is kept as the
+job's last result. The scheduler thread runs a job for at most `slice_seconds`
+at a time, then sleeps long enough that the job uses no more than its
+`cpu_budget` share of one core. Request handlers therefore keep most of the
+interpreter even while a long job is running.
+
+Jobs run one at a time, in the order they come due. A job that raises is
+recorded as failed and is tried again at its next interval.
+"""
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Generator, List, Optional
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Generator],
+        interval: float,
+        cpu_budget: float = 0.1,
+        slice_seconds: float = 0.005,
+        initial_delay: Optional[float] = None,
+    ) -> None:
+        if not 0 < cpu_budget <= 1:
+            raise ValueError("cpu_budget must be in (0, 1]")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cpu_budget = cpu_budget
+        self.slice_seconds = slice_seconds
+        self.next_run = time.monotonic() + (interval if initial_delay is None else initial_delay)
+
+        self.runs = 0
+        self.failures = 0
+        self.running = False
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_busy: Optional[float] = None
+        self.last_result = None
+        self.last_error: Optional[str] = None
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval,
+            "cpu_budget": self.cpu_budget,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started": self.last_started,
+            "last_duration_seconds": self.last_duration,
+            "last_busy_seconds": self.last_busy,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "next_run_in_seconds": max(0.0, round(self.next_run - time.monotonic(), 3)),
+        }
+
+
+class Scheduler:
+    def __init__(self, poll_interval: float = 1.0) -> None:
+        self.poll_interval = poll_interval
+        self.jobs: Dict[str, Job] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, job: Job) -> Job:
+        self.jobs[job.name] = job
+        return job
+
+    def start(self) -> None:
+        if self._thread is not None or not self.jobs:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_job(self, job: Job) -> None:
+        """Run one job to completion, sliced and throttled to its CPU budget."""
+        job.running = True
+        job.last_started = time.time()
+        started = time.perf_counter()
+        busy = 0.0
+        try:
+            steps = job.func()
+            while True:
+                slice_start = time.perf_counter()
+                deadline = slice_start + job.slice_seconds
+                try:
+                    while time.perf_counter() < deadline:
+                        next(steps)
+                except StopIteration as done:
+                    job.last_result = done.value
+                    job.last_error = None
+                    break
+                finally:
+                    spent = time.perf_counter() - slice_start
+                    busy += spent
+                # stay under budget: `spent` out of every `spent / budget` seconds
+                if self._stop.wait(spent * (1 - job.cpu_budget) / job.cpu_budget):
+                    steps.close()
+                    break
+        except Exception:
+            job.failures += 1
+            job.last_error = traceback.format_exc(limit=3)
+        finally:
+            job.runs += 1
+            job.running = False
+            job.last_duration = time.perf_counter() - started
+            job.last_busy = busy
+            job.next_run = time.monotonic() + job.interval
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [job for job in self.jobs.values() if job.next_run <= now]
+            for job in sorted(due, key=lambda j: j.next_run):
+                if self._stop.is_set():
+                    return
+                self.run_job(job)
+            upcoming = min(job.next_run for job in self.jobs.values()) - time.monotonic()
+            self._stop.wait(min(max(upcoming, 0.0), self.poll_interval))
+
+    def status(self) -> List[dict]:
+        return [job.status() for job in self.jobs.values()]
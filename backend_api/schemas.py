@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, HttpUrl, Field
+from pydantic import BaseModel, HttpUrl, Field, model_validator
 
 
 class BusinessBase(BaseModel):
@@ -8,14 +8,25 @@ class BusinessBase(BaseModel):
     category: Optional[str] = None
     website: Optional[HttpUrl] = None
     google_maps_url: Optional[HttpUrl] = None
+    # filled from google_maps_url at ingest when the URL carries coordinates
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     has_instagram: bool = False
     has_facebook: bool = False
     reviews_count: int = 0
     avg_rating: float = 0.0
 
 
+def _check_coordinate_pair(latitude_set: bool, longitude_set: bool) -> None:
+    if latitude_set != longitude_set:
+        raise ValueError("latitude and longitude must be given together")
+
+
 class BusinessCreate(BusinessBase):
-    pass
+    @model_validator(mode="after")
+    def _coordinates_together(self):
+        _check_coordinate_pair(self.latitude is not None, self.longitude is not None)
+        return self
 
 
 class BusinessUpdate(BaseModel):
@@ -24,11 +35,22 @@ class BusinessUpdate(BaseModel):
     category: Optional[str] = None
     website: Optional[HttpUrl] = None
     google_maps_url: Optional[HttpUrl] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     has_instagram: Optional[bool] = None
     has_facebook: Optional[bool] = None
     reviews_count: Optional[int] = None
     avg_rating: Optional[float] = None
 
+    @model_validator(mode="after")
+    def _coordinates_together(self):
+        # both keys must be sent, and then both set or both null (null clears the pair)
+        sent = self.model_fields_set
+        _check_coordinate_pair("latitude" in sent, "longitude" in sent)
+        if "latitude" in sent:
+            _check_coordinate_pair(self.latitude is not None, self.longitude is not None)
+        return self
+
 
 class Business(BusinessBase):
     id: int
@@ -36,3 +58,7 @@ class Business(BusinessBase):
 
     class Config:
         orm_mode = True
+
+
+class BusinessNearby(Business):
+    distance_km: float
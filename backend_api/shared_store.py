@@ -0,0 +1,406 @@
+"""
+Shared business store for running the API with several uvicorn workers.
+
+One store process owns the authoritative `InMemoryDB` and applies every write.
+Each worker keeps a full local replica and serves reads from it; the store
+publishes its current version in a small memory-mapped file, so a worker only
+has to compare two integers before a read to know whether it must pull the
+changes it is missing. Writes return only after the version is published, so
+a read issued after a write returns, on any worker, sees that write.
+
+Usage (from project root):
+
+    py -m backend_api.shared_store --address $XDG_RUNTIME_DIR/atl-store.sock
+    STORE_ADDRESS=$XDG_RUNTIME_DIR/atl-store.sock py -m uvicorn backend_api.main:app --workers 4
+
+Keep the socket in a directory only the service user can write to (not
+/tmp): the key and version files are created next to it.
+
+On Windows use a named pipe address such as `\\\\.\\pipe\\atl-store`.
+
+Connections exchange pickles, so they are authenticated: the store writes a
+random key to `<address>.key` (mode 0600) unless `STORE_AUTHKEY` is set, and
+workers read it from there. The version file sits next to the socket too
+(`<address>.version`); for named pipes both go in a per-user folder.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from typing import Dict, List, Optional, Tuple
+
+from .database import InMemoryDB, business_matches
+from .geo import GridIndex
+from .jobs import build_scheduler
+from .lead_scoring import calculate_lead_score
+from .schemas import Business, BusinessCreate, BusinessUpdate
+
+# (epoch, version): the epoch changes whenever the store restarts
+VERSION = struct.Struct("<QQ")
+
+
+def _state_base(address: str) -> str:
+    """Path prefix for the files that accompany a store address.
+
+    They sit next to a Unix socket, so they share its directory permissions.
+    Named pipes have no directory, so their files go in a per-user folder.
+    """
+    if address.startswith("\\\\"):
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        folder = os.path.join(root, "atl-business-store")
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, hashlib.sha1(address.encode("utf-8")).hexdigest()[:16])
+    return os.path.abspath(address)
+
+
+def version_path(address: str) -> str:
+    return _state_base(address) + ".version"
+
+
+def key_path(address: str) -> str:
+    return _state_base(address) + ".key"
+
+
+def _env_authkey() -> Optional[bytes]:
+    key = os.environ.get("STORE_AUTHKEY")
+    return key.encode("utf-8") if key else None
+
+
+_NOFOLLOW = getattr(os, "O_NOFOLLOW", 0)
+
+
+def _check_private(fd: int, path: str, unreadable: bool = False) -> None:
+    """Refuse files another user owns or could have written (or read, for secrets)."""
+    if not hasattr(os, "getuid"):
+        return  # Windows: the per-user folder (see _state_base) is the protection
+    st = os.fstat(fd)
+    blocked = 0o077 if unreadable else 0o022
+    if st.st_uid != os.getuid() or st.st_mode & blocked:
+        raise PermissionError(f"{path} is not private to this user; remove it and restart the store")
+
+
+def _open_version_file(path: str, create: bool):
+    try:
+        if not create:
+            raise FileExistsError
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL | _NOFOLLOW, 0o644)
+    except FileExistsError:
+        # Reuse an existing version file in place: replicas may still have it
+        # mapped, and truncating or replacing it would cut them off.
+        fd = os.open(path, (os.O_RDWR if create else os.O_RDONLY) | _NOFOLLOW)
+        try:
+            _check_private(fd, path)
+        except OSError:
+            os.close(fd)
+            raise
+    return os.fdopen(fd, "r+b" if create else "rb")
+
+
+def create_authkey(address: str) -> bytes:
+    """Key for a new store: STORE_AUTHKEY, or a random one saved owner-only next to the address.
+
+    The key matters: connections exchange pickles, so whoever holds it can run
+    code in the store.
+    """
+    key = _env_authkey()
+    if key is not None:
+        return key
+    key = secrets.token_hex(32).encode("ascii")
+    path = key_path(address)
+    if os.path.lexists(path):
+        os.unlink(path)  # stale key from a previous run; never write through whatever is there
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | _NOFOLLOW, 0o600)
+    try:
+        os.write(fd, key)
+    finally:
+        os.close(fd)
+    return key
+
+
+def read_authkey(address: str) -> bytes:
+    key = _env_authkey()
+    if key is not None:
+        return key
+    path = key_path(address)
+    fd = os.open(path, os.O_RDONLY | _NOFOLLOW)
+    with os.fdopen(fd, "rb") as f:
+        _check_private(fd, path, unreadable=True)
+        return f.read()
+
+
+class StoreServer:
+    """Single writer: serializes all writes and keeps a change log for replicas."""
+
+    def __init__(self, address: str, db: Optional[InMemoryDB] = None, authkey: Optional[bytes] = None,
+                 log_size: int = 10000) -> None:
+        self.address = address
+        self.db = db or InMemoryDB()
+        self.epoch = time.time_ns()
+        self.version = 0
+        self._log = deque(maxlen=log_size)
+        self._lock = threading.RLock()
+        self._closed = False
+        self._connections = set()
+        self.scheduler = None
+        # checked first: a refused version file must not leave a socket behind
+        self._version_file = _open_version_file(version_path(address), create=True)
+        self._listener = Listener(address, authkey=authkey or create_authkey(address))
+        self._version_file.seek(0)
+        self._version_file.write(VERSION.pack(self.epoch, self.version))
+        self._version_file.flush()
+        self._version_mm = mmap.mmap(self._version_file.fileno(), VERSION.size)
+
+    def _publish(self, business_id: int, business: Optional[Business]) -> None:
+        self.version += 1
+        self._log.append((self.version, business_id, business))
+        VERSION.pack_into(self._version_mm, 0, self.epoch, self.version)
+
+    def _sync(self, epoch: int, since: int) -> dict:
+        reply = {"epoch": self.epoch, "version": self.version, "reset": False}
+        oldest = self._log[0][0] if self._log else self.version + 1
+        if epoch != self.epoch or since + 1 < oldest:
+            reply.update(reset=True, changes=[(b.id, b) for b in self.db.list_businesses()])
+        else:
+            reply["changes"] = [(business_id, business) for v, business_id, business in self._log if v > since]
+        return reply
+
+    def handle(self, op: str, *args):
+        with self._lock:
+            if op == "sync":
+                return self._sync(*args)
+            if op == "create":
+                business = self.db.create_business(args[0])
+                self.db.set_lead_score(business.id, calculate_lead_score(business))
+                self._publish(business.id, business)
+                return self.version, business.id
+            if op == "update":
+                business = self.db.update_business(*args)
+                if business:
+                    self.db.set_lead_score(business.id, calculate_lead_score(business))
+                    self._publish(business.id, business)
+                return self.version, business is not None
+            if op == "delete":
+                deleted = self.db.delete_business(args[0])
+                if deleted:
+                    self._publish(args[0], None)
+                return self.version, deleted
+            if op == "score":
+                business = self.set_lead_score(*args)
+                return self.version, business is not None
+            if op == "jobs":
+                return self.scheduler.status() if self.scheduler else []
+        raise ValueError(f"unknown store operation {op!r}")
+
+    # background jobs (jobs.py) read from the db directly and write through here
+    def iter_businesses(self):
+        return self.db.iter_businesses()
+
+    def set_lead_score(self, business_id: int, score: float) -> Optional[Business]:
+        with self._lock:  # re-entrant: also reached from handle()
+            business = self.db.set_lead_score(business_id, score)
+            if business:
+                self._publish(business_id, business)
+            return business
+
+    def _serve_connection(self, conn) -> None:
+        try:
+            while True:
+                try:
+                    op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(("ok", self.handle(op, *args)))
+                except Exception as e:
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            self._connections.discard(conn)
+            conn.close()
+
+    def serve_forever(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                continue  # wrong key: drop the peer, keep serving
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            self._connections.add(conn)
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def close(self) -> None:
+        self._closed = True
+        self._listener.close()
+        for conn in list(self._connections):
+            conn.close()
+        self._version_mm.close()
+        self._version_file.close()
+
+
+class SharedStoreClient:
+    """Drop-in replacement for `InMemoryDB` backed by a `StoreServer`."""
+
+    def __init__(self, address: str, authkey: Optional[bytes] = None) -> None:
+        self.address = address
+        self._authkey = authkey
+        self._conn = None
+        self._lock = threading.Lock()
+        self._version_mm = None
+        self._epoch = 0
+        self._version = 0
+        self._cache: Dict[int, Business] = {}
+        self._list: Optional[List[Business]] = None
+        self._geo = GridIndex()
+
+    def _call(self, op: str, *args):
+        # connect lazily so workers may start before the store
+        with self._lock:
+            for attempt in range(2):
+                if self._conn is None:
+                    # re-read the key on every connect: a restarted store writes a new one
+                    self._conn = Client(self.address, authkey=self._authkey or read_authkey(self.address))
+                try:
+                    self._conn.send((op, args))
+                    status, result = self._conn.recv()
+                    break
+                except (EOFError, OSError):
+                    # store restarted: reconnect once, the next sync resets the replica
+                    self._conn = None
+                    if attempt:
+                        raise
+        if status != "ok":
+            raise RuntimeError(result)
+        return result
+
+    def _published_version(self):
+        if self._version_mm is None:
+            try:
+                with _open_version_file(version_path(self.address), create=False) as f:
+                    self._version_mm = mmap.mmap(f.fileno(), VERSION.size, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None
+        return VERSION.unpack_from(self._version_mm, 0)
+
+    def _sync(self, at_least: int = 0) -> None:
+        with self._lock:
+            if self._version >= at_least and self._published_version() == (self._epoch, self._version):
+                return
+            epoch, since = self._epoch, self._version
+        reply = self._call("sync", epoch, since)
+        with self._lock:
+            if reply["epoch"] == self._epoch and reply["version"] <= self._version:
+                return  # a concurrent sync already applied these changes
+            if reply["reset"]:
+                self._cache = dict(reply["changes"])
+                self._geo.clear()
+                self._geo.bulk_load((b.id, b.latitude, b.longitude) for b in self._cache.values()
+                                    if b.latitude is not None and b.longitude is not None)
+            else:
+                for business_id, business in reply["changes"]:
+                    if business is None:
+                        self._cache.pop(business_id, None)
+                        self._geo.remove(business_id)
+                    else:
+                        self._cache[business_id] = business
+                        self._geo.update(business_id, business.latitude, business.longitude)
+            self._epoch = reply["epoch"]
+            self._version = reply["version"]
+            self._list = None
+
+    def _refresh(self) -> None:
+        if self._published_version() != (self._epoch, self._version):
+            self._sync()
+
+    def warm_up(self) -> None:
+        """Pull the initial replica. Called from a background thread once the server is up."""
+        try:
+            self._refresh()
+        except (OSError, EOFError):
+            pass  # store not up yet; the first request will sync
+
+    def list_businesses(self, neighborhood: Optional[str] = None, category: Optional[str] = None,
+                        min_lead_score: Optional[float] = None) -> List[Business]:
+        self._refresh()
+        businesses = self._list
+        if businesses is None:
+            businesses = self._list = sorted(self._cache.values(), key=lambda b: b.id)
+        if neighborhood or category or min_lead_score is not None:
+            businesses = [b for b in businesses if business_matches(b, neighborhood, category, min_lead_score)]
+        return businesses
+
+    def get_business(self, business_id: int) -> Optional[Business]:
+        self._refresh()
+        return self._cache.get(business_id)
+
+    def businesses_near(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Business, float]]:
+        self._refresh()
+        cache = self._cache
+        return [(cache[business_id], distance) for business_id, distance in self._geo.within(lat, lon, radius_km)
+                if business_id in cache]
+
+    def create_business(self, data: BusinessCreate) -> Business:
+        version, business_id = self._call("create", data)
+        self._sync(at_least=version)
+        return self._cache[business_id]
+
+    def update_business(self, business_id: int, data: BusinessUpdate) -> Optional[Business]:
+        version, updated = self._call("update", business_id, data)
+        self._sync(at_least=version)
+        return self._cache.get(business_id) if updated else None
+
+    def delete_business(self, business_id: int) -> bool:
+        version, deleted = self._call("delete", business_id)
+        self._sync(at_least=version)
+        return deleted
+
+    def set_lead_score(self, business_id: int, score: float) -> Optional[Business]:
+        business = self.get_business(business_id)
+        if business is None or business.lead_score == score:
+            return business  # the store already scores its own writes
+        version, updated = self._call("score", business_id, score)
+        self._sync(at_least=version)
+        return self._cache.get(business_id) if updated else None
+
+    def job_status(self) -> List[dict]:
+        return self._call("jobs")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the shared business store for multi-worker deployments")
+    parser.add_argument("--address", default=os.environ.get("STORE_ADDRESS"), required="STORE_ADDRESS" not in os.environ,
+                        help="Unix socket path (or named pipe on Windows)")
+    parser.add_argument("--snapshot", default=os.environ.get("SNAPSHOT_PATH"), help="Snapshot to load at startup")
+    args = parser.parse_args(argv)
+
+    db = InMemoryDB()
+    if args.snapshot and os.path.exists(args.snapshot):
+        db.load_snapshot(args.snapshot)
+    if os.path.exists(args.address) and not args.address.startswith("\\\\"):
+        os.unlink(args.address)  # stale socket from a previous run
+
+    server = StoreServer(args.address, db=db)
+    # jobs run here rather than in the workers, writing through the server so replicas see them
+    server.scheduler = build_scheduler(db, writer=server)
+    server.scheduler.start()
+    print(f"Business store listening on {args.address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.scheduler.stop()
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Compact binary snapshot of the business table.
+
+Layout (little-endian, every section aligned to 8 bytes):
+
+    header     magic, format version, row count, next id, string table offset/size
+    columns    id (int64), lead_score (float64), avg_rating (float64),
+               latitude, longitude (float64, NaN for None),
+               reviews_count (int64), flags (uint8: instagram, facebook)
+    strings    one (offset, length) uint32 pair per row for each text column,
+               pointing into the string table; offset 0xFFFFFFFF means None
+    table      UTF-8 string table, each distinct value stored once
+
+`Snapshot` maps the file with `mmap` and reads the columns through
+`memoryview` casts, so opening a snapshot costs the same for 10 rows or 1M.
+`Business` objects are only built when a row is accessed.
+
+Build a snapshot from a JSON export:
+
+    py -m backend_api.snapshot businesses.json businesses.snap
+"""
+import bisect
+import itertools
+import math
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Generator, Iterable, Iterator, List, Optional, Tuple
+
+from .schemas import Business
+
+MAGIC = b"ATLSNAP\x00"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sIIQQQQ")
+NULL_OFFSET = 0xFFFFFFFF
+
+STRING_FIELDS = ("name", "neighborhood", "category", "website", "google_maps_url")
+FIXED_COLUMNS = (
+    ("id", 8), ("lead_score", 8), ("avg_rating", 8), ("latitude", 8), ("longitude", 8),
+    ("reviews_count", 8), ("flags", 1),
+)
+FLAG_INSTAGRAM = 1
+FLAG_FACEBOOK = 2
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _column_layout(rows: int):
+    """Return (offsets dict, end offset) for the fixed-width columns."""
+    offsets = {}
+    pos = _align(HEADER.size)
+    for name, width in FIXED_COLUMNS:
+        offsets[name] = pos
+        pos = _align(pos + rows * width)
+    for name in STRING_FIELDS:
+        offsets[name] = pos
+        pos = _align(pos + rows * 8)
+    return offsets, pos
+
+
+# struct code and row -> value for each fixed-width column
+_FIXED_VALUES = {
+    "id": ("q", lambda b: b.id),
+    "lead_score": ("d", lambda b: b.lead_score),
+    "avg_rating": ("d", lambda b: b.avg_rating),
+    "latitude": ("d", lambda b: math.nan if b.latitude is None else b.latitude),
+    "longitude": ("d", lambda b: math.nan if b.longitude is None else b.longitude),
+    "reviews_count": ("q", lambda b: b.reviews_count),
+    "flags": ("B", lambda b: (FLAG_INSTAGRAM if b.has_instagram else 0) | (FLAG_FACEBOOK if b.has_facebook else 0)),
+}
+
+
+def write_snapshot(path: str, businesses: Iterable[Business], next_id: Optional[int] = None) -> int:
+    """Write `businesses` (in ascending id order) to `path`. Returns the row count."""
+    steps = write_snapshot_steps(path, businesses, next_id)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def write_snapshot_steps(path: str, businesses: Iterable[Business], next_id: Optional[int] = None,
+                         batch: int = 2000) -> Generator[None, None, int]:
+    """`write_snapshot` as a generator that yields after every `batch` rows of each column.
+
+    Lets a scheduled job encode a large snapshot in slices. A partly written
+    file is removed if the generator fails or is closed early.
+    """
+    rows = list(businesses)
+    n = len(rows)
+    offsets, table_offset = _column_layout(n)
+    if next_id is None:
+        next_id = (rows[-1].id + 1) if rows else 1
+    batches = [rows[start:start + batch] for start in range(0, n, batch)]
+
+    f = open(path, "wb")
+    try:
+        # table size is patched in once the string columns are written
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, n, next_id, table_offset, 0))
+        last_id = -math.inf
+        for name, _ in FIXED_COLUMNS:
+            f.write(b"\x00" * (offsets[name] - f.tell()))
+            code, value_of = _FIXED_VALUES[name]
+            for chunk in batches:
+                values = [value_of(b) for b in chunk]
+                if name == "id":
+                    if any(a >= b for a, b in zip([last_id] + values, values)):
+                        raise ValueError("businesses must be in ascending id order")
+                    last_id = values[-1]
+                f.write(struct.pack(f"<{len(values)}{code}", *values))
+                yield
+
+        table = bytearray()
+        interned = {}
+        for field in STRING_FIELDS:
+            f.write(b"\x00" * (offsets[field] - f.tell()))
+            for chunk in batches:
+                refs = []
+                for b in chunk:
+                    value = getattr(b, field)
+                    if value is None:
+                        refs.extend((NULL_OFFSET, 0))
+                        continue
+                    encoded = str(value).encode("utf-8")
+                    ref = interned.get(encoded)
+                    if ref is None:
+                        ref = (len(table), len(encoded))
+                        interned[encoded] = ref
+                        table += encoded
+                    refs.extend(ref)
+                if len(table) >= NULL_OFFSET:
+                    raise ValueError("string table exceeds 4 GiB")
+                f.write(struct.pack(f"<{len(refs)}I", *refs))
+                yield
+
+        f.write(b"\x00" * (table_offset - f.tell()))
+        for start in range(0, len(table), 1 << 20):
+            f.write(table[start:start + (1 << 20)])
+            yield
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, n, next_id, table_offset, len(table)))
+        f.close()
+    except BaseException:
+        f.close()
+        os.remove(path)
+        raise
+    return n
+
+
+class Snapshot:
+    """Read-only, memory-mapped view over a snapshot file."""
+
+    def __init__(self, path: str) -> None:
+        if sys.byteorder != "little":
+            raise ValueError("snapshots can only be mapped on little-endian hosts")
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, rows, next_id, table_offset, table_size = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a business snapshot")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"unsupported snapshot version {version}")
+        except Exception:
+            self._mm.close()
+            raise
+
+        self.row_count = rows
+        self.next_id = next_id
+        offsets, _ = _column_layout(rows)
+        view = memoryview(self._mm)
+        self._view = view
+        self._ids = view[offsets["id"]:offsets["id"] + rows * 8].cast("q")
+        self._lead_scores = view[offsets["lead_score"]:offsets["lead_score"] + rows * 8].cast("d")
+        self._ratings = view[offsets["avg_rating"]:offsets["avg_rating"] + rows * 8].cast("d")
+        self._latitudes = view[offsets["latitude"]:offsets["latitude"] + rows * 8].cast("d")
+        self._longitudes = view[offsets["longitude"]:offsets["longitude"] + rows * 8].cast("d")
+        self._reviews = view[offsets["reviews_count"]:offsets["reviews_count"] + rows * 8].cast("q")
+        self._flags = view[offsets["flags"]:offsets["flags"] + rows]
+        self._strings = {
+            field: view[offsets[field]:offsets[field] + rows * 8].cast("I") for field in STRING_FIELDS
+        }
+        self._table = view[table_offset:table_offset + table_size]
+        self._distinct: Dict[str, Dict[int, int]] = {}
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def id_at(self, row: int) -> int:
+        return self._ids[row]
+
+    def index_of(self, business_id: int) -> Optional[int]:
+        i = bisect.bisect_left(self._ids, business_id)
+        if i < self.row_count and self._ids[i] == business_id:
+            return i
+        return None
+
+    def _string(self, field: str, row: int) -> Optional[str]:
+        refs = self._strings[field]
+        offset = refs[2 * row]
+        if offset == NULL_OFFSET:
+            return None
+        return str(self._table[offset:offset + refs[2 * row + 1]], "utf-8")
+
+    def _offsets_equal(self, field: str, value: str) -> set:
+        """String-table offsets in `field` whose text equals `value`, ignoring case."""
+        distinct = self._distinct.get(field)
+        if distinct is None:
+            refs = self._strings[field]
+            distinct = self._distinct[field] = dict(zip(refs[0::2], refs[1::2]))
+            distinct.pop(NULL_OFFSET, None)
+        value = value.lower()
+        table = self._table
+        return {offset for offset, length in distinct.items()
+                if str(table[offset:offset + length], "utf-8").lower() == value}
+
+    def matching_rows(self, neighborhood: Optional[str] = None, category: Optional[str] = None,
+                      min_lead_score: Optional[float] = None) -> List[int]:
+        """Rows passing the list filters, evaluated on the mapped columns without building models."""
+        rows = None
+        if min_lead_score is not None:
+            rows = list(itertools.compress(range(self.row_count), map(float(min_lead_score).__le__, self._lead_scores)))
+        for field, value in (("neighborhood", neighborhood), ("category", category)):
+            if not value:
+                continue
+            wanted = self._offsets_equal(field, value)
+            offsets = self._strings[field][0::2]
+            if rows is None:
+                rows = list(itertools.compress(range(self.row_count), map(wanted.__contains__, offsets)))
+            else:
+                rows = [row for row in rows if offsets[row] in wanted]
+        return list(range(self.row_count)) if rows is None else rows
+
+    def _coordinate(self, column: memoryview, row: int) -> Optional[float]:
+        value = column[row]
+        return None if math.isnan(value) else value
+
+    def coordinates(self) -> Iterator[Tuple[int, float, float]]:
+        """Yield (id, lat, lon) for every row that has coordinates, without building models."""
+        ids, latitudes, longitudes = self._ids, self._latitudes, self._longitudes
+        for row in range(self.row_count):
+            lat = latitudes[row]
+            if not math.isnan(lat):
+                yield ids[row], lat, longitudes[row]
+
+    def business_at(self, row: int) -> Business:
+        flags = self._flags[row]
+        return Business(
+            id=self._ids[row],
+            lead_score=self._lead_scores[row],
+            avg_rating=self._ratings[row],
+            latitude=self._coordinate(self._latitudes, row),
+            longitude=self._coordinate(self._longitudes, row),
+            reviews_count=self._reviews[row],
+            has_instagram=bool(flags & FLAG_INSTAGRAM),
+            has_facebook=bool(flags & FLAG_FACEBOOK),
+            **{field: self._string(field, row) for field in STRING_FIELDS},
+        )
+
+    def get(self, business_id: int) -> Optional[Business]:
+        row = self.index_of(business_id)
+        if row is None:
+            return None
+        return self.business_at(row)
+
+    def __iter__(self) -> Iterator[Business]:
+        for row in range(self.row_count):
+            yield self.business_at(row)
+
+    def close(self) -> None:
+        for name in ("_ids", "_lead_scores", "_ratings", "_latitudes", "_longitudes", "_reviews", "_flags", "_table"):
+            getattr(self, name).release()
+        for column in self._strings.values():
+            column.release()
+        self._view.release()
+        self._mm.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Build a binary snapshot from a JSON list of businesses")
+    parser.add_argument("source", help="JSON file, e.g. the output of GET /businesses")
+    parser.add_argument("out", help="Snapshot file to write")
+    args = parser.parse_args(argv)
+
+    with open(args.source, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    businesses = [Business(**{"id": i, **r}) for i, r in enumerate(records, start=1)]
+    businesses.sort(key=lambda b: b.id)
+    count = write_snapshot(args.out, businesses)
+    print(f"Wrote {count} businesses to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
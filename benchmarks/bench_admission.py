@@ -0,0 +1,117 @@
+"""
+Load test: point-lookup latency while `GET /businesses` is flooded.
+
+Runs uvicorn twice, once with admission control disabled and once with the
+defaults, seeds it, then floods the list endpoint from many threads while one
+thread measures `GET /businesses/{id}` and `/health` latency.
+
+Usage (from project root):
+
+    py benchmarks\\bench_admission.py --rows 2000 --flooders 32 --seconds 10
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for(url, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                if r.status == 200:
+                    return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def flood(port, stop, statuses):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while not stop.is_set():
+        try:
+            conn.request("GET", "/businesses")
+            resp = conn.getresponse()
+            resp.read()
+            statuses[resp.status] = statuses.get(resp.status, 0) + 1
+        except Exception:
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+
+
+def probe(port, path, stop, latencies):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while not stop.is_set():
+        start = time.perf_counter()
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.01)
+
+
+def run(label, env_overrides, args):
+    env = os.environ.copy()
+    env.update(env_overrides)
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend_api.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=ROOT, env=env)
+    try:
+        base = f"http://127.0.0.1:{args.port}"
+        wait_for(base + "/health")
+        for i in range(args.rows):
+            payload = {"name": f"Load {i}", "neighborhood": "Midtown", "category": "Cafe", "reviews_count": i % 200}
+            req = urllib.request.Request(base + "/businesses", data=json.dumps(payload).encode(),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+            urllib.request.urlopen(req).read()
+
+        stop = threading.Event()
+        statuses = {}
+        lookups, health = [], []
+        threads = [threading.Thread(target=flood, args=(args.port, stop, statuses)) for _ in range(args.flooders)]
+        threads.append(threading.Thread(target=probe, args=(args.port, f"/businesses/{args.rows // 2}", stop, lookups)))
+        threads.append(threading.Thread(target=probe, args=(args.port, "/health", stop, health)))
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        print(f"{label}:")
+        print(f"  GET /businesses/{{id}}  p50 {percentile(lookups, 50):7.1f} ms  p99 {percentile(lookups, 99):7.1f} ms")
+        print(f"  GET /health           p50 {percentile(health, 50):7.1f} ms  p99 {percentile(health, 99):7.1f} ms")
+        print(f"  list responses by status: {dict(sorted(statuses.items()))}", flush=True)
+    finally:
+        api.terminate()
+        api.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--flooders", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8004)
+    args = parser.parse_args()
+
+    # the load generator is a single client, so per-client rate limits are lifted for seeding
+    run("admission control off", {"RATE_LIMIT_PER_SECOND": "0", "EXPENSIVE_MAX_CONCURRENCY": "0"}, args)
+    run("admission control on", {"RATE_LIMIT_PER_SECOND": "0"}, args)
+
+
+if __name__ == "__main__":
+    main()
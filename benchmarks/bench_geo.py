@@ -0,0 +1,67 @@
+"""
+Benchmark: radius queries through `GridIndex` vs. a linear haversine scan.
+
+Points are spread uniformly over Georgia; queries are centred on random
+points in the metro Atlanta area.
+
+Usage (from project root):
+
+    py benchmarks\\bench_geo.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_api.geo import GridIndex, haversine_km  # noqa: E402
+
+
+def linear_scan(points, lat, lon, radius_km):
+    hits = []
+    for business_id, plat, plon in points:
+        distance = haversine_km(lat, lon, plat, plon)
+        if distance <= radius_km:
+            hits.append((business_id, distance))
+    hits.sort(key=lambda hit: (hit[1], hit[0]))
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    points = [(i, rng.uniform(30.4, 35.0), rng.uniform(-85.6, -80.8)) for i in range(1, args.rows + 1)]
+
+    start = time.perf_counter()
+    index = GridIndex()
+    index.bulk_load(points)
+    print(f"Index build for {args.rows} rows: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    centres = [(rng.uniform(33.6, 33.9), rng.uniform(-84.55, -84.25)) for _ in range(args.queries)]
+    for radius in (1.0, 5.0, 25.0):
+        grid_total = scan_total = 0.0
+        hits = 0
+        for lat, lon in centres:
+            start = time.perf_counter()
+            got = index.within(lat, lon, radius)
+            grid_total += time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = linear_scan(points, lat, lon, radius)
+            scan_total += time.perf_counter() - start
+            assert got == expected
+            hits += len(got)
+        grid_ms = grid_total / len(centres) * 1000
+        scan_ms = scan_total / len(centres) * 1000
+        print(f"radius {radius:5.1f} km  ~{hits // len(centres):6d} hits  "
+              f"grid {grid_ms:9.2f} ms  linear {scan_ms:9.1f} ms  ({scan_ms / grid_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
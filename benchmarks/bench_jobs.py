@@ -0,0 +1,74 @@
+"""
+Benchmark: request latency while a background rescore job runs.
+
+Measures p50/p99 of GET /businesses/{id} (in-process TestClient) with no
+job, then with a rescore job over a separate N-row DB at each CPU budget.
+A budget of 1.0 approximates running the job unthrottled.
+
+Usage (from project root):
+
+    py benchmarks\\bench_jobs.py --rows 100000 --budgets 0.05 0.1 0.25 1.0
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["SCHEDULER_ENABLED"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend_api.database import InMemoryDB  # noqa: E402
+from backend_api.jobs import rescore_job  # noqa: E402
+from backend_api.main import app  # noqa: E402
+from backend_api.scheduler import Job, Scheduler  # noqa: E402
+from backend_api.schemas import BusinessCreate  # noqa: E402
+
+
+def stale_db(rows):
+    db = InMemoryDB()
+    for i in range(rows):
+        db.create_business(BusinessCreate(name=f"Business {i}", reviews_count=i % 50, avg_rating=4.0))
+    return db
+
+
+def measure(client, business_id, requests):
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get(f"/businesses/{business_id}")
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), statistics.quantiles(samples, n=100)[98]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--budgets", type=float, nargs="+", default=[0.05, 0.1, 0.25, 1.0])
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    business_id = client.post("/businesses", json={"name": "Bench Biz"}).json()["id"]
+    measure(client, business_id, 50)
+
+    p50, p99 = measure(client, business_id, args.requests)
+    print(f"{'no job':<14} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+    for budget in args.budgets:
+        db = stale_db(args.rows)
+        scheduler = Scheduler()
+        job = scheduler.add(Job("rescore", lambda: rescore_job(db), interval=3600, cpu_budget=budget, initial_delay=0))
+        scheduler.start()
+        while not job.running and job.runs == 0:
+            time.sleep(0.01)
+        p50, p99 = measure(client, business_id, args.requests)
+        note = "" if job.running else "  (job finished during measurement; raise --rows)"
+        scheduler.stop()
+        print(f"budget {budget:<7} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms{note}")
+
+
+if __name__ == "__main__":
+    main()
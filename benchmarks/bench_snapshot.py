@@ -0,0 +1,107 @@
+"""
+Benchmark: time-to-first-request after a restart, JSON reload vs. mmap snapshot.
+
+JSON reload is what a restart costs today: parse the export and rebuild every
+`Business` through Pydantic before the first request can be answered. The
+snapshot path opens the binary file with `mmap` and answers from it directly.
+
+Usage (from project root):
+
+    py benchmarks\\bench_snapshot.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from backend_api.database import db  # noqa: E402
+from backend_api.main import app  # noqa: E402
+from backend_api.schemas import Business  # noqa: E402
+from backend_api.snapshot import write_snapshot  # noqa: E402
+
+NEIGHBORHOODS = ["Midtown", "Downtown", "Old Fourth Ward", "Inman Park", "West End", "Buckhead"]
+CATEGORIES = ["Cafe", "Bookstore", "Bar", "Restaurant", "Salon", "Gym"]
+
+
+def make_records(rows):
+    for i in range(1, rows + 1):
+        yield {
+            "id": i,
+            "name": f"Business {i}",
+            "neighborhood": NEIGHBORHOODS[i % len(NEIGHBORHOODS)],
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "website": f"http://business{i}.example/" if i % 3 else None,
+            "google_maps_url": None,
+            "has_instagram": bool(i % 2),
+            "has_facebook": bool(i % 5),
+            "reviews_count": i % 300,
+            "avg_rating": (i % 50) / 10,
+            "lead_score": float(i % 100),
+        }
+
+
+def reset_db():
+    if db._snapshot is not None:
+        db._snapshot.close()
+    db._snapshot = None
+    db._overrides.clear()
+    db._businesses.clear()
+    db._next_id = 1
+
+
+def first_request(client, business_id):
+    r = client.get(f"/businesses/{business_id}")
+    assert r.status_code == 200, r.text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    target = args.rows // 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "businesses.json")
+        snap_path = os.path.join(tmp, "businesses.snap")
+
+        print(f"Preparing {args.rows} rows...")
+        records = list(make_records(args.rows))
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        write_snapshot(snap_path, (Business(**r) for r in records))
+        del records
+        print(f"  JSON     {os.path.getsize(json_path) / 1e6:8.1f} MB")
+        print(f"  snapshot {os.path.getsize(snap_path) / 1e6:8.1f} MB")
+
+        reset_db()
+        start = time.perf_counter()
+        with open(json_path, "r", encoding="utf-8") as f:
+            loaded = [Business(**r) for r in json.load(f)]
+        db._businesses.extend(loaded)
+        db._next_id = loaded[-1].id + 1
+        first_request(client, target)
+        json_elapsed = time.perf_counter() - start
+        del loaded
+
+        reset_db()
+        start = time.perf_counter()
+        db.load_snapshot(snap_path)
+        first_request(client, target)
+        snap_elapsed = time.perf_counter() - start
+        reset_db()
+
+    print(f"Time to first request ({args.rows} rows):")
+    print(f"  JSON reload   {json_elapsed * 1000:10.1f} ms")
+    print(f"  mmap snapshot {snap_elapsed * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: cold-start cost of the API process and the CLI.
+
+Reports, for both entry points:
+- `python -X importtime` totals (sum of top-level cumulative import times),
+  next to a bare interpreter for reference
+- time-to-first-response: uvicorn spawn -> first 200 from /health and from
+  GET /businesses/{id}; CLI spawn -> `cli.py get` exits with the record
+
+Pass `--snapshot-rows N` to start the API on an N-row snapshot with
+coordinates, so deferred index warmup shows up in the numbers.
+
+Not deferred, and so included in every API number: importing FastAPI and
+Pydantic and building the route/schema models. uvicorn needs the finished
+app object before it can listen.
+
+Usage (from project root):
+
+    py benchmarks\\bench_startup.py --runs 5 --snapshot-rows 200000
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def import_total_ms(args, env=None):
+    """Sum of top-level cumulative import times reported by -X importtime."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # top-level imports only; nested ones are included
+            total += int(cumulative)
+    return total / 1000
+
+
+def wait_for_response(port, path, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", path)
+            if conn.getresponse().status == 200:
+                return time.perf_counter()
+        except OSError:
+            time.sleep(0.005)
+    raise RuntimeError(f"no response from {path}")
+
+
+def api_first_response(port, env):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend_api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        health = wait_for_response(port, "/health", start + 60) - start
+        lookup = wait_for_response(port, "/businesses/1", start + 60) - start
+        return health * 1000, lookup * 1000
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def cli_first_response(port, env):
+    env = {**env, "API_URL": f"http://127.0.0.1:{port}", "API_CACHE_DIR": ""}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "cli_tools/cli.py", "get", "1"], cwd=ROOT, env=env,
+                   stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def build_snapshot(path, rows):
+    from backend_api.schemas import Business
+    from backend_api.snapshot import write_snapshot
+
+    write_snapshot(path, (
+        Business(id=i, name=f"Business {i}", neighborhood="Midtown", category="Cafe",
+                 latitude=33.0 + (i % 1000) / 500, longitude=-85.0 + (i // 1000 % 1000) / 500)
+        for i in range(1, rows + 1)
+    ))
+
+
+def report(label, samples):
+    print(f"  {label:<34} median {statistics.median(samples):8.1f} ms   min {min(samples):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8005)
+    parser.add_argument("--snapshot-rows", type=int, default=0)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as tmp:
+        # at least one record so GET /businesses/1 has something to return
+        env["SNAPSHOT_PATH"] = os.path.join(tmp, "businesses.snap")
+        build_snapshot(env["SNAPSHOT_PATH"], max(1, args.snapshot_rows))
+
+        print("Import time (-X importtime, top-level cumulative):")
+        report("interpreter only", [import_total_ms(["-c", "pass"], env) for _ in range(args.runs)])
+        report("import backend_api.main", [import_total_ms(["-c", "import backend_api.main"], env)
+                                           for _ in range(args.runs)])
+        report("cli.py --help", [import_total_ms(["cli_tools/cli.py", "--help"], env) for _ in range(args.runs)])
+
+        print("Time to first response:")
+        api = [api_first_response(args.port, env) for _ in range(args.runs)]
+        report("uvicorn -> GET /health", [h for h, _ in api])
+        report("uvicorn -> GET /businesses/1", [lookup for _, lookup in api])
+
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend_api.main:app", "--port", str(args.port), "--log-level", "warning"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_response(args.port, "/health", time.perf_counter() + 60)
+            report("cli.py get 1 (process wall time)", [cli_first_response(args.port, env) for _ in range(args.runs)])
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+            print(f"  {'(bare interpreter wall time)':<34} {(time.perf_counter() - started) * 1000:8.1f} ms")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: read throughput of the shared store with 1, 2 and 4 uvicorn workers.
+
+Starts `backend_api.shared_store` plus uvicorn for each worker count, seeds
+the store, then drives `GET /businesses/{id}` from several client processes
+over keep-alive connections and reports requests per second.
+
+Usage (from project root, Linux/macOS):
+
+    python benchmarks/bench_workers.py --workers 1 2 4 --seconds 5
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for(url, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                if r.status == 200:
+                    return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def client_loop(port, ids, seconds, counter):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    done = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        conn.request("GET", f"/businesses/{ids[done % len(ids)]}")
+        resp = conn.getresponse()
+        resp.read()
+        done += 1
+    with counter.get_lock():
+        counter.value += done
+
+
+def run(workers, port, clients, seconds, rows):
+    tmp = tempfile.mkdtemp()
+    env = os.environ.copy()
+    env["STORE_ADDRESS"] = os.path.join(tmp, "store.sock")
+    env["RATE_LIMIT_PER_SECOND"] = "0"  # all clients share one address
+    store = subprocess.Popen([sys.executable, "-m", "backend_api.shared_store"], cwd=ROOT, env=env,
+                             stdout=subprocess.DEVNULL)
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend_api.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        wait_for(base + "/health")
+        ids = []
+        for i in range(rows):
+            req = urllib.request.Request(base + "/businesses", data=json.dumps({"name": f"Bench {i}"}).encode(),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+            with urllib.request.urlopen(req) as r:
+                ids.append(json.loads(r.read())["id"])
+
+        counter = multiprocessing.Value("q", 0)
+        procs = [multiprocessing.Process(target=client_loop, args=(port, ids, seconds, counter))
+                 for _ in range(clients)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        return counter.value / seconds
+    finally:
+        api.terminate()
+        store.terminate()
+        api.wait()
+        store.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8003)
+    args = parser.parse_args()
+
+    baseline = None
+    for n in args.workers:
+        rps = run(n, args.port, args.clients, args.seconds, args.rows)
+        baseline = baseline or rps
+        print(f"workers={n:2d}  {rps:9.0f} req/s  ({rps / baseline:.2f}x)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
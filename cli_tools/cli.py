@@ -3,6 +3,7 @@ CLI for managing businesses via the backend API.
 Usage examples:
   py cli_tools\cli.py list
   py cli_tools\cli.py get 1
+  py cli_tools\cli.py near --lat 33.749 --lon -84.388 --radius-km 5
   py cli_tools\cli.py create --file sample.json
   py cli_tools\cli.py update 1 --file update.json
   py cli_tools\cli.py delete 1
@@ -12,37 +13,88 @@ import os
 import sys
 import json
 import argparse
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError, URLError
+
+# Network, compression and CSV modules are imported inside the functions that
+# use them: this script runs from cron and health checks, where interpreter
+# start-up is most of the run time.
 
 API_URL = os.environ.get("API_URL", "http://127.0.0.1:8000")
+# GET responses are cached with their ETag and revalidated with If-None-Match.
+# Set API_CACHE_DIR to an empty string to disable the cache.
+API_CACHE_DIR = os.environ.get("API_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "atl-business-cli"))
+
+
+def _cache_path(url):
+    import hashlib
+    return os.path.join(API_CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def load_cached(url):
+    if not API_CACHE_DIR:
+        return None
+    try:
+        with open(_cache_path(url), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_cached(url, etag, body):
+    if not API_CACHE_DIR:
+        return
+    try:
+        os.makedirs(API_CACHE_DIR, exist_ok=True)
+        with open(_cache_path(url), "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "body": body}, f)
+    except OSError:
+        pass
+
+
+def read_body(resp):
+    raw = resp.read()
+    if resp.headers.get("Content-Encoding") == "gzip":
+        import gzip
+        raw = gzip.decompress(raw)
+    return raw.decode("utf-8")
 
 
 def request_json(method, path, payload=None):
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError, URLError
+
     url = API_URL.rstrip("/") + path
     data = None
-    headers = {"Accept": "application/json"}
+    headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
     if payload is not None:
         data = json.dumps(payload).encode("utf-8")
         headers["Content-Type"] = "application/json"
+    cached = load_cached(url) if method == "GET" else None
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
     req = Request(url, data=data, headers=headers, method=method)
     try:
         with urlopen(req, timeout=10) as resp:
-            body = resp.read().decode("utf-8")
-            if body:
-                return json.loads(body)
-            return None
+            body = read_body(resp)
+            etag = resp.headers.get("ETag")
+            if method == "GET" and etag:
+                store_cached(url, etag, body)
     except HTTPError as e:
-        print(f"HTTP error {e.code}: {e.reason}")
-        try:
-            err = e.read().decode()
-            print(err)
-        except Exception:
-            pass
-        return None
+        if e.code == 304 and cached:
+            body = cached["body"]
+        else:
+            print(f"HTTP error {e.code}: {e.reason}")
+            try:
+                err = read_body(e)
+                print(err)
+            except Exception:
+                pass
+            return None
     except URLError as e:
         print(f"Network error: {e}")
         return None
+    if body:
+        return json.loads(body)
+    return None
 
 
 def cmd_list(args):
@@ -63,6 +115,21 @@ def cmd_list(args):
     print(json.dumps(res, indent=2))
 
 
+def cmd_near(args):
+    qs = [f"lat={args.lat}", f"lon={args.lon}", f"radius_km={args.radius_km}"]
+    if args.neighborhood:
+        qs.append(f"neighborhood={args.neighborhood}")
+    if args.category:
+        qs.append(f"category={args.category}")
+    if args.min_lead_score is not None:
+        qs.append(f"min_lead_score={args.min_lead_score}")
+    res = request_json("GET", "/businesses/near?" + "&".join(qs))
+    if res is None:
+        print("No businesses returned or an error occurred.")
+        return
+    print(json.dumps(res, indent=2))
+
+
 def load_payload_from_file(path):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
@@ -134,6 +201,15 @@ def main(argv=None):
     p_list.add_argument("--min-lead-score", dest="min_lead_score", type=float)
     p_list.set_defaults(func=cmd_list)
 
+    p_near = sub.add_parser("near", help="List businesses within a radius of a point")
+    p_near.add_argument("--lat", type=float, required=True)
+    p_near.add_argument("--lon", type=float, required=True)
+    p_near.add_argument("--radius-km", dest="radius_km", type=float, default=5.0)
+    p_near.add_argument("--neighborhood")
+    p_near.add_argument("--category")
+    p_near.add_argument("--min-lead-score", dest="min_lead_score", type=float)
+    p_near.set_defaults(func=cmd_near)
+
     p_get = sub.add_parser("get", help="Get a business by id")
     p_get.add_argument("id", type=int)
     p_get.set_defaults(func=cmd_get)
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend_api.admission import AdmissionController, AdmissionMiddleware, parse_route_limits, route_key
+
+
+def _app(controller, release=None):
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/businesses")
+    def list_businesses():
+        if release is not None:
+            release.wait(5)
+        return []
+
+    @app.get("/businesses/{business_id}")
+    def get_business(business_id: int):
+        return {"id": business_id}
+
+    return app
+
+
+def test_route_key_and_limit_parsing():
+    app = _app(AdmissionController())
+    scope = {"type": "http", "method": "GET", "app": app, "root_path": ""}
+    assert route_key({**scope, "path": "/businesses/17"}) == "GET /businesses/{business_id}"
+    assert route_key({**scope, "path": "/businesses"}) == "GET /businesses"
+    assert route_key({**scope, "path": "/wp-admin/x.php"}) == "GET (unmatched)"
+    assert parse_route_limits("GET /businesses=5:10; POST /businesses=2") == {
+        "GET /businesses": (5.0, 10.0),
+        "POST /businesses": (2.0, 2.0),
+    }
+
+
+def test_token_bucket_per_route_and_health_exempt():
+    controller = AdmissionController(rate=0.01, burst=2)
+    client = TestClient(_app(controller))
+
+    assert client.get("/businesses/1").status_code == 200
+    assert client.get("/businesses/2").status_code == 200
+    limited = client.get("/businesses/3")
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) >= 1
+
+    # other routes have their own bucket and health checks are never limited
+    assert client.get("/businesses").status_code == 200
+    for _ in range(5):
+        assert client.get("/health").status_code == 200
+
+    stats = controller.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["routes"]["GET /businesses/{business_id}"] == {"admitted": 2, "rate_limited": 1}
+
+
+def test_junk_paths_share_one_key_and_full_tables_evict_lru():
+    controller = AdmissionController(rate=100, burst=100)
+    client = TestClient(_app(controller))
+    for i in range(20):
+        assert client.get(f"/junk/{i}").status_code == 404
+    assert list(controller.stats()["routes"]) == ["GET (unmatched)"]
+
+    # buckets that have not refilled cannot be pruned; the oldest go first
+    controller = AdmissionController(rate=0.001, burst=5, max_buckets=4)
+    for i in range(10):
+        controller.take_token(f"client-{i}", "GET /businesses")
+    assert 0 < len(controller._buckets) <= 4
+    assert ("client-9", "GET /businesses") in controller._buckets
+
+
+def test_expensive_routes_are_capped_and_shed():
+    release = threading.Event()
+    controller = AdmissionController(rate=0, max_concurrency=1, max_queue=1, queue_timeout=0.2)
+    client = TestClient(_app(controller, release))
+
+    results = []
+    holder = threading.Thread(target=lambda: results.append(client.get("/businesses").status_code))
+    holder.start()
+    deadline = time.time() + 5
+    while controller.stats()["active"] < 1 and time.time() < deadline:
+        time.sleep(0.01)
+
+    # one request waits in the queue and times out; with the queue full the next is shed at once
+    waiter = threading.Thread(target=lambda: results.append(client.get("/businesses").status_code))
+    waiter.start()
+    while controller.stats()["waiting"] < 1 and time.time() < deadline:
+        time.sleep(0.01)
+    assert client.get("/businesses").status_code == 503
+    # point lookups and health checks are not held up by the cap
+    assert client.get("/businesses/1").status_code == 200
+    assert client.get("/health").status_code == 200
+
+    waiter.join(5)
+    release.set()
+    holder.join(5)
+    assert sorted(results) == [200, 503]
+
+    stats = controller.stats()
+    assert stats["shed_queue_full"] == 1
+    assert stats["shed_timeout"] == 1
+    assert stats["active"] == 0 and stats["waiting"] == 0
+    assert client.get("/businesses").status_code == 200
+
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    controller = AdmissionController(rate=0, max_concurrency=1, max_queue=4, queue_timeout=1.0)
+
+    async def scenario():
+        assert await controller.acquire_slot() is None
+        waiting = asyncio.ensure_future(controller.acquire_slot())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        try:
+            await waiting
+        except asyncio.CancelledError:
+            pass
+        controller.release_slot()
+        assert controller.stats()["active"] == 0 and controller.stats()["waiting"] == 0
+        assert await controller.acquire_slot() is None
+
+    asyncio.run(scenario())
+
+
+def test_admission_stats_endpoint():
+    from backend_api.main import app
+
+    client = TestClient(app)
+    r = client.get("/admin/admission")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["limits"]["expensive_routes"] == ["GET /businesses", "GET /businesses/near"]
+    assert "admitted" in body and "shed_timeout" in body
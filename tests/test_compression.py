@@ -0,0 +1,105 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend_api.compression import CompressionMiddleware, negotiate
+from backend_api.etag import ETagMiddleware
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=500, encodings=["gzip"])
+    state = {"rows": [{"id": i, "neighborhood": "Midtown", "category": "Cafe"} for i in range(100)]}
+
+    @app.get("/rows")
+    def rows():
+        return state["rows"]
+
+    @app.get("/small")
+    def small():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"line %d\n" % i * 20 for i in range(50)), media_type="text/plain")
+
+    return app, state
+
+
+def test_negotiate():
+    assert negotiate("gzip, deflate", ["zstd", "br", "gzip"]) == "gzip"
+    assert negotiate("br;q=0.5, gzip;q=0.8", ["br", "gzip"]) == "gzip"
+    assert negotiate("zstd, gzip", ["zstd", "gzip"]) == "zstd"
+    assert negotiate("*", ["br", "gzip"]) == "br"
+    assert negotiate("gzip;q=0, identity", ["gzip"]) is None
+
+
+def test_large_json_is_compressed_with_encoded_etag():
+    app, _ = _app()
+    client = TestClient(app)
+
+    r = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.headers["etag"].endswith('-gzip"')
+    assert len(r.json()) == 100
+
+    plain = client.get("/rows", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] == r.headers["etag"].replace("-gzip", "")
+    assert r.num_bytes_downloaded < plain.num_bytes_downloaded / 3
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_if_none_match_returns_304_until_data_changes():
+    app, state = _app()
+    client = TestClient(app)
+
+    for encoding in ("gzip", "identity"):
+        first = client.get("/rows", headers={"Accept-Encoding": encoding})
+        etag = first.headers["etag"]
+        again = client.get("/rows", headers={"Accept-Encoding": encoding, "If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+        assert again.headers.get("vary") == first.headers.get("vary")
+
+    etag = client.get("/rows", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    state["rows"] = state["rows"][:-1]
+    changed = client.get("/rows", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 99
+
+
+def test_streaming_responses_are_compressed_incrementally():
+    app, _ = _app()
+    client = TestClient(app)
+
+    r = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "etag" not in r.headers
+    assert r.text == "".join("line %d\n" % i * 20 for i in range(50))
+
+
+def test_api_list_supports_conditional_requests():
+    from backend_api.main import app
+
+    client = TestClient(app)
+    ids = [client.post("/businesses", json={"name": f"Etag Biz {i}", "neighborhood": "Midtown"}).json()["id"]
+           for i in range(20)]
+    try:
+        r = client.get("/businesses", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert client.get("/businesses", headers={"Accept-Encoding": "gzip",
+                                                  "If-None-Match": r.headers["etag"]}).status_code == 304
+
+        single = client.get(f"/businesses/{ids[0]}")
+        assert client.get(f"/businesses/{ids[0]}", headers={"If-None-Match": single.headers["etag"]}).status_code == 304
+    finally:
+        for business_id in ids:
+            client.delete(f"/businesses/{business_id}")
@@ -0,0 +1,165 @@
+import random
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend_api.database import InMemoryDB
+from backend_api.geo import GridIndex, coords_from_maps_url, haversine_km
+from backend_api.schemas import BusinessCreate, BusinessUpdate
+from backend_api.snapshot import write_snapshot
+
+
+def test_coords_from_maps_url():
+    assert coords_from_maps_url("https://www.google.com/maps/place/ATL+Coffee/@33.7811,-84.3838,17z") == (33.7811, -84.3838)
+    assert coords_from_maps_url(
+        "https://www.google.com/maps/place/X/@33.78,-84.38,17z/data=!3m1!4b1!4m5!3m4!1s0x0:0x0!8m2!3d33.7812!4d-84.3839"
+    ) == (33.7812, -84.3839)
+    assert coords_from_maps_url("https://maps.google.com/?q=33.749,-84.388") == (33.749, -84.388)
+    assert coords_from_maps_url("https://maps.google.com/?q=ATL+Coffee") is None
+    assert coords_from_maps_url("http://maps.example/atlcoffee") is None
+    assert coords_from_maps_url("https://maps.google.com/?ll=133.0,-84.0") is None
+    assert coords_from_maps_url(None) is None
+
+
+def test_grid_index_matches_linear_scan():
+    rng = random.Random(7)
+    points = [(i, rng.uniform(33.4, 34.1), rng.uniform(-84.8, -84.0)) for i in range(3000)]
+    # a few near the antimeridian and the pole to exercise wrap-around
+    points += [(5000, 10.0, 179.99), (5001, 10.0, -179.99), (5002, 89.99, 45.0), (5003, 89.99, -135.0)]
+    index = GridIndex()
+    index.bulk_load(points)
+
+    for lat, lon, radius in [(33.749, -84.388, 5.0), (33.9, -84.1, 12.5), (10.0, 180.0, 3.0), (89.99, 0.0, 5.0)]:
+        expected = sorted(
+            (i, haversine_km(lat, lon, plat, plon)) for i, plat, plon in points
+            if haversine_km(lat, lon, plat, plon) <= radius
+        )
+        got = index.within(lat, lon, radius)
+        assert sorted(got) == expected
+        assert [d for _, d in got] == sorted(d for _, d in got)
+
+    index.remove(5000)
+    assert [i for i, _ in index.within(10.0, 180.0, 3.0)] == [5001]
+
+
+def test_grid_index_queries_tolerate_concurrent_writes():
+    index = GridIndex()
+    index.bulk_load((i, 33.7 + (i % 100) / 1000, -84.4 + (i // 100) / 1000) for i in range(2000))
+    stop = threading.Event()
+
+    def churn():
+        i = 0
+        while not stop.is_set():
+            index.insert(10000 + i % 500, 33.7 + (i % 37) / 1000, -84.4 + (i % 41) / 1000)
+            index.remove(10000 + (i + 250) % 500)
+            i += 1
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(100):
+            index.within(33.75, -84.38, 5.0)
+            index.within(33.75, -84.38, 500.0)
+    finally:
+        stop.set()
+        writer.join()
+        sys.setswitchinterval(interval)
+
+
+def test_db_indexes_coordinates_from_urls_and_updates(tmp_path):
+    db = InMemoryDB()
+    a = db.create_business(BusinessCreate(name="A", google_maps_url="https://maps.google.com/?q=33.749,-84.388"))
+    b = db.create_business(BusinessCreate(name="B", latitude=33.76, longitude=-84.39))
+    db.create_business(BusinessCreate(name="C"))
+    assert (a.latitude, a.longitude) == (33.749, -84.388)
+    assert [biz.name for biz, _ in db.businesses_near(33.75, -84.388, 2.0)] == ["A", "B"]
+
+    db.update_business(b.id, BusinessUpdate(google_maps_url="https://www.google.com/maps/@34.05,-84.3,15z"))
+    assert [biz.name for biz, _ in db.businesses_near(33.75, -84.388, 2.0)] == ["A"]
+    db.delete_business(a.id)
+    assert db.businesses_near(33.75, -84.388, 2.0) == []
+
+    # explicit coordinates win over the URL; a new URL without coordinates clears stale ones
+    d = db.create_business(BusinessCreate(name="D", latitude=10.0, longitude=20.0,
+                                          google_maps_url="https://maps.google.com/?q=33.7,-84.3"))
+    assert (d.latitude, d.longitude) == (10.0, 20.0)
+    db.update_business(d.id, BusinessUpdate(google_maps_url="https://maps.google.com/?q=D+Cafe"))
+    assert (d.latitude, d.longitude) == (None, None)
+    db.delete_business(d.id)
+    with pytest.raises(ValueError):
+        BusinessCreate(name="E", latitude=10.0)
+    with pytest.raises(ValueError):
+        BusinessUpdate(longitude=20.0)
+    with pytest.raises(ValueError):
+        BusinessUpdate(latitude=10.0, longitude=None)
+    assert BusinessUpdate(latitude=None, longitude=None).latitude is None
+
+    path = str(tmp_path / "geo.snap")
+    write_snapshot(path, db.list_businesses())
+    reloaded = InMemoryDB()
+    reloaded.load_snapshot(path)
+    [(biz, distance)] = reloaded.businesses_near(34.05, -84.3, 1.0)
+    assert biz.name == "B" and distance < 0.01
+    assert reloaded.get_business(3).latitude is None
+
+
+def test_near_endpoint_combines_filters():
+    from backend_api.main import app
+
+    client = TestClient(app)
+    created = []
+    for name, category, reviews, lat in [("Near Cafe", "Cafe", 100, 33.750), ("Near Bar", "Bar", 0, 33.751),
+                                         ("Far Cafe", "Cafe", 100, 34.5)]:
+        r = client.post("/businesses", json={"name": name, "category": category, "reviews_count": reviews,
+                                             "latitude": lat, "longitude": -84.388})
+        assert r.status_code == 200
+        created.append(r.json()["id"])
+    try:
+        r = client.get("/businesses/near", params={"lat": 33.749, "lon": -84.388, "radius_km": 2})
+        assert r.status_code == 200
+        assert [b["name"] for b in r.json()] == ["Near Cafe", "Near Bar"]
+        assert r.json()[0]["distance_km"] < r.json()[1]["distance_km"]
+
+        r = client.get("/businesses/near", params={"lat": 33.749, "lon": -84.388, "radius_km": 2,
+                                                    "category": "cafe", "min_lead_score": 20})
+        assert [b["name"] for b in r.json()] == ["Near Cafe"]
+
+        assert client.get("/businesses/near", params={"lat": 95, "lon": 0, "radius_km": 1}).status_code == 422
+    finally:
+        for business_id in created:
+            client.delete(f"/businesses/{business_id}")
+
+
+def test_snapshot_geo_index_is_deferred_until_warm_up(tmp_path):
+    path = str(tmp_path / "geo.snap")
+    source = InMemoryDB()
+    source.create_business(BusinessCreate(name="A", latitude=33.75, longitude=-84.39))
+    source.create_business(BusinessCreate(name="B", latitude=33.76, longitude=-84.39))
+    write_snapshot(path, source.list_businesses())
+
+    db = InMemoryDB()
+    db.load_snapshot(path)
+    assert len(db._geo) == 0
+    # a write loads the deferred index first, so the load can never overwrite it
+    db.update_business(1, BusinessUpdate(latitude=40.0, longitude=-80.0))
+    db.warm_up()
+    assert len(db._geo) == 2
+    assert [b.name for b, _ in db.businesses_near(33.75, -84.39, 5)] == ["B"]
+    assert [b.name for b, _ in db.businesses_near(40.0, -80.0, 1)] == ["A"]
+
+
+def test_rescoring_a_snapshot_row_keeps_it_in_the_deferred_geo_index(tmp_path):
+    path = str(tmp_path / "geo.snap")
+    source = InMemoryDB()
+    source.create_business(BusinessCreate(name="A", latitude=33.75, longitude=-84.39))
+    write_snapshot(path, source.list_businesses())
+
+    db = InMemoryDB()
+    db.load_snapshot(path)
+    db.set_lead_score(1, 12.0)
+    [(business, _)] = db.businesses_near(33.75, -84.39, 1)
+    assert business.name == "A" and business.lead_score == 12.0
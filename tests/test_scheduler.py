@@ -0,0 +1,161 @@
+import csv
+import os
+import statistics
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend_api.database import InMemoryDB
+from backend_api.jobs import compact_job, export_job, rescore_job
+from backend_api.scheduler import Job, Scheduler
+from backend_api.schemas import BusinessCreate, BusinessUpdate
+from backend_api.snapshot import write_snapshot
+
+
+def _stale_db(n):
+    # create_business leaves lead_score at 0, so every row needs rescoring
+    db = InMemoryDB()
+    for i in range(n):
+        db.create_business(BusinessCreate(name=f"Biz {i}", website="https://x.example" if i % 2 else None,
+                                          reviews_count=i % 50, avg_rating=4.0, latitude=33.7, longitude=-84.4))
+    return db
+
+
+def _run(steps):
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def test_job_records_result_and_stays_within_cpu_budget():
+    def spin():
+        for _ in range(20):
+            deadline = time.perf_counter() + 0.002
+            while time.perf_counter() < deadline:
+                pass
+            yield
+        return "done"
+
+    def broken():
+        yield
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler()
+    job = scheduler.add(Job("spin", spin, interval=60, cpu_budget=0.25, slice_seconds=0.002))
+    scheduler.run_job(job)
+    assert job.last_result == "done" and job.runs == 1 and not job.running
+    assert 0.035 <= job.last_busy <= 0.08
+    # busy time is at most a quarter of the wall time, give or take one slice
+    assert job.last_duration >= job.last_busy / 0.25 - 0.01
+
+    failing = scheduler.add(Job("broken", broken, interval=60))
+    scheduler.run_job(failing)
+    assert failing.failures == 1 and "boom" in failing.last_error
+    assert [s["name"] for s in scheduler.status()] == ["spin", "broken"]
+
+
+def test_rescore_and_export(tmp_path):
+    db = _stale_db(500)
+    steps = rescore_job(db, batch=100)
+    assert sum(1 for _ in steps) == 5
+    assert all(b.lead_score > 0 for b in db.list_businesses())
+    assert _run(rescore_job(db)) == {"scanned": 500, "changed": 0}
+    assert db.get_business(2).lead_score == 10.0 + 15.0 + 0.2 + 12.0
+
+    path = str(tmp_path / "export.csv")
+    scheduler = Scheduler()
+    job = scheduler.add(Job("export", lambda: export_job(db, path), interval=60))
+    scheduler.run_job(job)
+    assert job.last_result == {"rows": 500, "path": path}
+    assert os.listdir(tmp_path) == ["export.csv"]
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["name"] == "Biz 1" and float(rows[1]["lead_score"]) == db.get_business(2).lead_score
+
+
+@pytest.mark.skipif(os.name == "nt", reason="snapshots are not folded on Windows")
+def test_compact_folds_changes_into_snapshot(tmp_path):
+    path = str(tmp_path / "businesses.snap")
+    source = _stale_db(50)
+    write_snapshot(path, source.list_businesses())
+
+    db = InMemoryDB()
+    db.load_snapshot(path)
+    db.warm_up()
+    db.update_business(3, BusinessUpdate(name="Renamed", latitude=40.0, longitude=-80.0))
+    db.delete_business(4)
+    db.create_business(BusinessCreate(name="New"))
+
+    assert _run(compact_job(db, path, min_changes=3)) == {"geo_rebuilt": True, "snapshot_folded": True, "rows": 50}
+    assert db.overlay_size == 0
+    assert os.listdir(tmp_path) == ["businesses.snap"]
+    assert db.get_business(3).name == "Renamed" and db.get_business(4) is None
+    assert db.get_business(51).name == "New"
+    assert [b.name for b, _ in db.businesses_near(40.0, -80.0, 1)] == ["Renamed"]
+
+    reloaded = InMemoryDB()
+    reloaded.load_snapshot(path)
+    assert len(reloaded.list_businesses()) == 50
+    assert reloaded.create_business(BusinessCreate(name="Next")).id == 52
+
+    # a write in the middle of a fold wins; the fold is dropped
+    db.update_business(5, BusinessUpdate(name="Changed"))
+    steps = compact_job(db, path, min_changes=1)
+    next(steps)
+    next(steps)
+    db.update_business(6, BusinessUpdate(name="During fold"))
+    assert _run(steps)["snapshot_folded"] is False
+    assert db.get_business(6).name == "During fold"
+    assert set(db._overrides) == {5, 6}
+    assert os.listdir(tmp_path) == ["businesses.snap"]
+
+
+def test_request_p99_stays_bounded_while_jobs_run():
+    from backend_api.main import app
+
+    client = TestClient(app)
+    business_id = client.post("/businesses", json={"name": "Latency Biz"}).json()["id"]
+
+    def p99(samples):
+        return statistics.quantiles(samples, n=100)[98]
+
+    def measure(n=300):
+        samples = []
+        for _ in range(n):
+            started = time.perf_counter()
+            assert client.get(f"/businesses/{business_id}").status_code == 200
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    try:
+        measure(50)
+        baseline = p99(measure())
+
+        busy_db = _stale_db(40000)
+        scheduler = Scheduler()
+        job = scheduler.add(Job("rescore", lambda: rescore_job(busy_db), interval=3600, initial_delay=0,
+                                cpu_budget=0.1))
+        scheduler.start()
+        try:
+            deadline = time.monotonic() + 5
+            while not job.running and time.monotonic() < deadline:
+                time.sleep(0.01)
+            with_jobs = p99(measure())
+            assert job.running, "rescore finished before the measurement did; make it bigger"
+        finally:
+            scheduler.stop()
+
+        assert with_jobs <= baseline * 3 + 0.02, (baseline, with_jobs)
+    finally:
+        client.delete(f"/businesses/{business_id}")
+
+
+def test_jobs_endpoint_lists_job_status():
+    from backend_api.main import app
+
+    jobs = TestClient(app).get("/admin/jobs").json()
+    assert {"rescore", "compact"} <= {job["name"] for job in jobs}
+    assert all("last_duration_seconds" in job and "cpu_budget" in job for job in jobs)
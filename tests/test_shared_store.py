@@ -0,0 +1,194 @@
+import os
+import sys
+import time
+import json
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+import pytest
+
+from backend_api.schemas import BusinessCreate, BusinessUpdate
+from backend_api.shared_store import SharedStoreClient, StoreServer
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="tests use Unix socket addresses")
+
+
+@pytest.fixture
+def store(tmp_path):
+    server = StoreServer(str(tmp_path / "store.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.close()
+
+
+def test_replicas_read_each_others_writes(store):
+    a = SharedStoreClient(store.address)
+    b = SharedStoreClient(store.address)
+
+    created = a.create_business(BusinessCreate(name="Replica Biz", reviews_count=10))
+    assert created.lead_score > 0
+    assert b.get_business(created.id).name == "Replica Biz"
+
+    b.update_business(created.id, BusinessUpdate(name="Renamed"))
+    assert a.get_business(created.id).name == "Renamed"
+    assert a.get_business(created.id).reviews_count == 10
+
+    assert b.update_business(999, BusinessUpdate(name="Missing")) is None
+    assert a.delete_business(created.id) is True
+    assert b.get_business(created.id) is None
+    assert b.list_businesses() == []
+    assert b.delete_business(created.id) is False
+
+
+def test_store_jobs_write_through_to_replicas(store):
+    from backend_api.jobs import rescore_job
+    from backend_api.scheduler import Job, Scheduler
+
+    client = SharedStoreClient(store.address)
+    created = client.create_business(BusinessCreate(name="Stale", reviews_count=10))
+    store.db.get_business(created.id).lead_score = 0.0  # e.g. scoring rules changed
+
+    store.scheduler = Scheduler()
+    job = store.scheduler.add(Job("rescore", lambda: rescore_job(store.db, store), interval=60))
+    store.scheduler.run_job(job)
+    assert job.last_result == {"scanned": 1, "changed": 1}
+    assert client.get_business(created.id).lead_score == created.lead_score
+    assert [status["name"] for status in client.job_status()] == ["rescore"]
+
+
+def test_store_requires_its_generated_key(store):
+    from multiprocessing.connection import AuthenticationError, Client
+    from backend_api.shared_store import key_path, version_path
+
+    assert os.stat(key_path(store.address)).st_mode & 0o777 == 0o600
+    assert os.path.dirname(version_path(store.address)) == os.path.dirname(store.address)
+    with pytest.raises(AuthenticationError):
+        Client(store.address, authkey=b"atl-business-store")
+    # the failed handshake does not stop the store from serving real replicas
+    assert SharedStoreClient(store.address).list_businesses() == []
+
+
+def test_store_refuses_planted_state_files(tmp_path):
+    from backend_api.shared_store import key_path, version_path
+
+    address = str(tmp_path / "store.sock")
+    planted = version_path(address)
+    with open(planted, "wb") as f:
+        f.write(b"\xff" * 16)
+    os.chmod(planted, 0o666)
+    with pytest.raises(PermissionError):
+        StoreServer(address)
+    assert not os.path.exists(address)
+    os.unlink(planted)
+
+    # a key path symlinked elsewhere is replaced, not written through
+    victim = tmp_path / "victim.txt"
+    victim.write_text("keep me")
+    os.symlink(victim, key_path(address))
+    server = StoreServer(address)
+    try:
+        assert victim.read_text() == "keep me"
+        assert not os.path.islink(key_path(address))
+    finally:
+        server.close()
+
+
+def test_replica_resets_after_store_restart(tmp_path):
+    address = str(tmp_path / "store.sock")
+    first = StoreServer(address)
+    threading.Thread(target=first.serve_forever, daemon=True).start()
+    client = SharedStoreClient(address)
+    client.create_business(BusinessCreate(name="Before restart"))
+    first.close()
+
+    second = StoreServer(address)
+    threading.Thread(target=second.serve_forever, daemon=True).start()
+    try:
+        assert client.list_businesses() == []
+    finally:
+        second.close()
+
+
+def _wait_for(url, deadline):
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                if r.status == 200:
+                    return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+@pytest.fixture(scope="module")
+def workers(tmp_path_factory):
+    """Start a store process plus uvicorn with 3 workers on port 8002."""
+    port = int(os.environ.get("WORKERS_PORT", "8002"))
+    base_url = f"http://127.0.0.1:{port}"
+    address = str(tmp_path_factory.mktemp("store") / "store.sock")
+    env = os.environ.copy()
+    env["STORE_ADDRESS"] = address
+
+    procs = []
+    try:
+        procs.append(subprocess.Popen([sys.executable, "-m", "backend_api.shared_store"], env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend_api.main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", "3"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    except FileNotFoundError:
+        pytest.skip("uvicorn not available in this environment")
+
+    if not _wait_for(base_url + "/health", time.time() + 15.0):
+        for p in procs:
+            p.terminate()
+        pytest.skip(f"Failed to start workers at {base_url}")
+
+    try:
+        yield base_url
+    finally:
+        for p in reversed(procs):
+            p.terminate()
+            try:
+                p.wait(timeout=5)
+            except Exception:
+                p.kill()
+
+
+def _request(method, url, payload=None):
+    data = None
+    headers = {"Accept": "application/json", "Connection": "close"}
+    if payload is not None:
+        data = json.dumps(payload).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    req = urllib.request.Request(url, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def test_read_your_writes_across_workers(workers):
+    base = workers
+    # every request opens a new connection, so consecutive calls land on arbitrary workers
+    for i in range(20):
+        status, created = _request("POST", base + "/businesses", {"name": f"Worker Biz {i}"})
+        assert status == 200
+        status, got = _request("GET", f"{base}/businesses/{created['id']}")
+        assert status == 200, f"write {created['id']} not visible to the next read"
+
+        status, updated = _request("PUT", f"{base}/businesses/{created['id']}", {"reviews_count": i})
+        assert status == 200
+        status, listed = _request("GET", base + "/businesses")
+        assert any(b["id"] == created["id"] and b["reviews_count"] == i for b in listed)
+
+        status, _ = _request("DELETE", f"{base}/businesses/{created['id']}")
+        assert status == 200
+        status, _ = _request("GET", f"{base}/businesses/{created['id']}")
+        assert status == 404
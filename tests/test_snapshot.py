@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from backend_api.database import InMemoryDB
+from backend_api.schemas import Business, BusinessCreate, BusinessUpdate
+from backend_api.snapshot import Snapshot, write_snapshot, write_snapshot_steps
+
+
+def _sample():
+    return [
+        Business(id=1, name="Snap Cafe", neighborhood="Midtown", category="Cafe",
+                 website="http://snap.example/", has_instagram=True, reviews_count=12,
+                 avg_rating=4.5, lead_score=42.0),
+        Business(id=2, name="Snap Books", neighborhood="Midtown", category=None,
+                 has_facebook=True, reviews_count=3, avg_rating=3.0, lead_score=20.5),
+        Business(id=5, name="Snap Bar é", neighborhood=None, category="Bar"),
+    ]
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "businesses.snap")
+    assert write_snapshot(path, _sample()) == 3
+
+    snap = Snapshot(path)
+    try:
+        assert len(snap) == 3
+        assert snap.next_id == 6
+        assert [b.dict() for b in snap] == [b.dict() for b in _sample()]
+        assert snap.get(5).name == "Snap Bar é"
+        assert snap.get(3) is None
+    finally:
+        snap.close()
+
+
+def test_db_overlay_on_snapshot(tmp_path):
+    path = str(tmp_path / "businesses.snap")
+    write_snapshot(path, _sample())
+
+    db = InMemoryDB()
+    db.load_snapshot(path)
+    assert [b.id for b in db.list_businesses()] == [1, 2, 5]
+
+    created = db.create_business(BusinessCreate(name="New Biz"))
+    assert created.id == 6
+
+    updated = db.update_business(1, BusinessUpdate(name="Renamed"))
+    updated.lead_score = 99.0
+    assert db.get_business(1).name == "Renamed"
+    assert db.get_business(1).lead_score == 99.0
+
+    assert db.delete_business(2) is True
+    assert db.get_business(2) is None
+    assert db.delete_business(2) is False
+
+    assert [b.id for b in db.list_businesses()] == [1, 5, 6]
+
+    # saving folds the overlay back into a fresh snapshot
+    out = str(tmp_path / "compacted.snap")
+    assert db.save_snapshot(out) == 3
+    reloaded = InMemoryDB()
+    reloaded.load_snapshot(out)
+    assert [b.name for b in reloaded.list_businesses()] == ["Renamed", "Snap Bar é", "New Biz"]
+    assert reloaded.create_business(BusinessCreate(name="Next")).id == 7
+
+
+def test_filtered_list_on_snapshot(tmp_path):
+    path = str(tmp_path / "businesses.snap")
+    write_snapshot(path, _sample())
+
+    db = InMemoryDB()
+    db.load_snapshot(path)
+    assert [b.id for b in db.list_businesses(neighborhood="midtown")] == [1, 2]
+    assert [b.id for b in db.list_businesses(category="BAR")] == [5]
+    assert [b.id for b in db.list_businesses(neighborhood="Midtown", min_lead_score=30)] == [1]
+    assert db.list_businesses(neighborhood="Nowhere") == []
+
+    # changed rows are matched on their current values
+    db.update_business(5, BusinessUpdate(neighborhood="Midtown"))
+    db.update_business(1, BusinessUpdate(neighborhood="Downtown"))
+    db.delete_business(2)
+    db.create_business(BusinessCreate(name="New Biz", neighborhood="MIDTOWN"))
+    assert [b.id for b in db.list_businesses(neighborhood="Midtown")] == [5, 6]
+    assert [b.id for b in db.list_businesses()] == [1, 5, 6]
+    assert db.list_businesses()[0].neighborhood == "Downtown"
+
+
+def test_snapshot_written_in_steps(tmp_path):
+    path = str(tmp_path / "businesses.snap")
+    rows = [Business(id=i, name=f"Biz {i}", neighborhood="Midtown") for i in range(1, 11)]
+    steps = write_snapshot_steps(path, rows, batch=4)
+    # 7 fixed and 5 string columns in 3 batches each, then the string table
+    assert sum(1 for _ in steps) == 12 * 3 + 1
+    snap = Snapshot(path)
+    try:
+        assert [b.dict() for b in snap] == [b.dict() for b in rows]
+    finally:
+        snap.close()
+
+    # a write stopped part way leaves no file behind
+    steps = write_snapshot_steps(path, rows, batch=4)
+    next(steps)
+    steps.close()
+    assert not os.path.exists(path)
+
+    with pytest.raises(ValueError):
+        write_snapshot(path, rows[5:] + rows[:5])
+    assert not os.path.exists(path)